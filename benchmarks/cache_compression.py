@@ -0,0 +1,86 @@
+"""Размер кеша HTTP-ответов и время тёплого запуска со сжатием и без.
+
+Страницы PEP из `tests/fixture_data` загружаются в кеш SQLite через
+заглушку requests_mock, затем замеряется чтение всех страниц из кеша.
+Строка «без сжатия» — сериализатор requests_cache по умолчанию.
+
+Запуск из корня репозитория:
+
+    python benchmarks/cache_compression.py
+"""
+import os
+import statistics
+import tempfile
+import time
+from importlib.util import find_spec
+
+from common import print_table
+
+import requests_cache
+from requests_mock import Adapter
+
+from compression import compressed_serializer
+from tests.fixture_data import pages
+
+PEP_COUNT = 300
+SECTION_COUNT = 20
+REPEAT = 5
+URL = 'https://peps.python.org/pep-{number:04d}/'
+
+
+def fill_cache(path, serializer):
+    session = requests_cache.CachedSession(
+        path, backend='sqlite', serializer=serializer
+    )
+    adapter = Adapter()
+    urls = []
+    for number in range(1, PEP_COUNT + 1):
+        urls.append(URL.format(number=number))
+        adapter.register_uri(
+            'GET',
+            urls[-1],
+            text=pages.pep_page(number, SECTION_COUNT),
+            headers={'Content-Type': 'text/html; charset=utf-8'},
+        )
+    session.mount('https://', adapter)
+    for url in urls:
+        session.get(url)
+    return session, urls
+
+
+def warm_run(session, urls):
+    start = time.perf_counter()
+    for url in urls:
+        assert session.get(url).from_cache
+    return time.perf_counter() - start
+
+
+def run():
+    serializers = [('без сжатия', 'pickle'), ('gzip', None)]
+    if find_spec('zstandard') is not None:
+        serializers.append(('zstd', None))
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for name, serializer in serializers:
+            path = os.path.join(directory, f'{name}.sqlite')
+            session, urls = fill_cache(
+                path, serializer or compressed_serializer(name)
+            )
+            timing = statistics.median(
+                warm_run(session, urls) for _ in range(REPEAT)
+            )
+            session.close()
+            rows.append((
+                name,
+                f'{os.path.getsize(path) / 2**20:.1f}',
+                f'{timing * 1000:.0f}',
+                f'{timing / len(urls) * 10**6:.0f}',
+            ))
+    print_table(
+        ('Сжатие', 'Размер кеша, МБ', 'Тёплый запуск, мс', 'На страницу, мкс'),
+        rows
+    )
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,89 @@
+"""Режимы по очереди и все вместе командой all.
+
+«По очереди» — как отдельные запуски: у каждого режима своя сессия
+и пустой кеш. «Вместе» — run_modes с одной сессией за Frontier, как
+`python main.py all`. Страницы отдаёт локальный сервер из `stand.py`
+с задержкой каждого ответа, имитирующей сеть.
+
+Запуск из корня репозитория:
+
+    python benchmarks/combined.py
+    python benchmarks/combined.py --delay 0.05 --workers 8
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+from argparse import Namespace
+from pathlib import Path
+
+from common import print_table
+from stand import DOCS_PATH, PEPS_PATH, serve_site
+
+MODES = ('pep', 'whats-new', 'latest-versions')
+PEP_COUNT = 100
+DELAY = 0.02
+
+
+def timed(server, run):
+    server.reset()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        run()
+    return time.perf_counter() - start, server.requests
+
+
+def fresh_session(create_session, cli_args):
+    session = create_session(cli_args)
+    session.cache.clear()
+    return session
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--pep-count', type=int, default=PEP_COUNT)
+    parser.add_argument('--delay', type=float, default=DELAY)
+    return parser.parse_args()
+
+
+def run():
+    args = parse_args()
+    sys.stderr = open(os.devnull, 'w')
+    logging.disable(logging.WARNING)
+    import main
+    from frontier import Frontier
+    from sessions import create_session
+
+    workdir = tempfile.mkdtemp()
+    os.chdir(workdir)
+    main.BASE_DIR = Path(workdir)
+    cli_args = Namespace(workers=args.workers, modes=MODES)
+    rows = []
+    with serve_site(args.pep_count, args.delay) as server:
+        main.MAIN_DOC_URL = server.base_url + DOCS_PATH
+        main.PEP_URL = server.base_url + PEPS_PATH
+        total_time = total_requests = 0
+        for mode in MODES:
+            seconds, requests = timed(server, lambda: list(
+                main.MODE_TO_FUNCTION[mode](
+                    fresh_session(create_session, cli_args), cli_args
+                )
+            ))
+            total_time += seconds
+            total_requests += requests
+            rows.append((mode, requests, f'{seconds:.2f}'))
+        rows.append(('по очереди', total_requests, f'{total_time:.2f}'))
+        seconds, requests = timed(server, lambda: main.run_modes(
+            Frontier(fresh_session(create_session, cli_args)), cli_args
+        ))
+        rows.append(('вместе (all)', requests, f'{seconds:.2f}'))
+    print_table(('Запуск', 'Запросов', 'Время, с'), rows)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,35 @@
+"""Общие функции для замеров производительности парсера."""
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR))
+sys.path.append(str(BASE_DIR / 'src'))
+
+
+def measure(function, repeat=20):
+    """Медианное время вызова function и пиковая память одного вызова."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak
+
+
+def print_table(header, rows):
+    """Печатает результаты замеров в виде таблицы."""
+    from prettytable import PrettyTable
+
+    table = PrettyTable()
+    table.field_names = header
+    table.align = 'r'
+    table.add_rows(rows)
+    print(table)
@@ -0,0 +1,117 @@
+"""Стоимость извлечения строки: строковые селекторы и планы извлечения.
+
+«Строки» — прежние функции извлечения, которые при каждом вызове
+передают CSS-селекторы и регулярные выражения строками, «План» —
+функции из main.py на скомпилированных ExtractionPlan. Страницы
+разбираются заранее, замеряется только извлечение.
+
+Запуск из корня репозитория:
+
+    python benchmarks/extraction_plans.py
+"""
+import re
+from urllib.parse import urljoin
+
+from common import measure, print_table
+
+import main
+from constants import PEP_URL
+from tests.fixture_data import pages
+from utils import find_tag, make_soup
+
+REPEAT = 50
+
+
+def pep_index(soup):
+    peps = []
+    for row in soup.select('#numerical-index tbody tr'):
+        status_tag, number_tag, *_ = row.find_all('td')
+        link = urljoin(PEP_URL, find_tag(
+            number_tag, 'a', attrs={'class': 'pep reference internal'}
+        )['href'])
+        peps.append((number_tag.text, link, status_tag.text[1:]))
+    return peps
+
+
+def pep_status(soup):
+    table = find_tag(
+        soup, 'dl', attrs={'class': 'rfc2822 field-list simple'}
+    )
+    return str(
+        table.find(string='Status').parent.find_next_sibling('dd').string
+    )
+
+
+def whats_new_links(soup):
+    return [
+        tag['href'] for tag in soup.select(
+            '#what-s-new-in-python div.toctree-wrapper li.toctree-l1 > a'
+        )
+    ]
+
+
+def versions(soup):
+    for ul in soup.select('div.sphinxsidebarwrapper ul'):
+        a_tags = ul.find_all('a')
+        break
+    results = []
+    pattern = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
+    for a_tag in a_tags:
+        text_match = re.search(pattern, a_tag.text)
+        if text_match is not None:
+            version, status = text_match.groups()
+        else:
+            version, status = a_tag.text, ''
+        results.append((a_tag['href'], version, status))
+    return results
+
+
+def archive_links(soup):
+    return [tag['href'] for tag in soup.select('table.docutils a[href]')]
+
+
+CASES = (
+    ('PEP index', pages.pep_index(700), pep_index, main.extract_pep_index),
+    ('PEP', pages.pep_page(8), pep_status, main.extract_pep_status),
+    (
+        "What's New",
+        pages.whats_new_index([f'3.{minor}' for minor in range(13)]),
+        whats_new_links,
+        main.extract_whats_new_links,
+    ),
+    ('Versions', pages.MAIN_DOC_PAGE, versions, main.extract_versions),
+    (
+        'Download',
+        pages.download_page(),
+        archive_links,
+        main.extract_archive_links,
+    ),
+)
+
+
+def run():
+    rows = []
+    for name, text, legacy, planned in CASES:
+        soup = make_soup(text, planned)
+        result = planned(soup)
+        assert list(map(tuple, result)) == list(map(tuple, legacy(soup))) \
+            if isinstance(result, list) else result == legacy(soup)
+        count = len(result) if isinstance(result, list) else 1
+        legacy_time, _ = measure(lambda: legacy(soup), REPEAT)
+        planned_time, _ = measure(lambda: planned(soup), REPEAT)
+        rows.append((
+            name,
+            count,
+            f'{legacy_time / count * 10**6:.1f}',
+            f'{planned_time / count * 10**6:.1f}',
+            f'{legacy_time / planned_time:.2f}',
+        ))
+    print_table(
+        ('Страница', 'Строк', 'Строки, мкс/строка', 'План, мкс/строка',
+         'Ускорение'),
+        rows
+    )
+
+
+if __name__ == '__main__':
+    run()
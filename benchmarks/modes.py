@@ -0,0 +1,178 @@
+"""Пропускная способность, задержка и пиковая память режимов парсера.
+
+Все режимы работают без сети, с локальным сервером из `stand.py`.
+Каждый режим запускается в отдельном процессе, чтобы пиковая память
+(ru_maxrss) относилась только к нему. С --save-baseline результаты
+сохраняются как эталон, а при следующих запусках сравниваются с ним:
+если пропускная способность упала или память выросла больше, чем на
+--threshold, скрипт завершается с кодом 1.
+
+Запуск из корня репозитория:
+
+    python benchmarks/modes.py --save-baseline
+    python benchmarks/modes.py --threshold 0.2
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from argparse import Namespace
+from pathlib import Path
+
+from common import BASE_DIR, print_table
+from stand import DOCS_PATH, PEPS_PATH, serve_site
+
+MODES = ('pep', 'whats-new', 'latest-versions', 'download')
+DEFAULT_BASELINE = BASE_DIR / 'benchmarks' / 'baseline.json'
+PEP_COUNT = 300
+REPEAT = 3
+THRESHOLD = 0.2
+THROUGHPUT_DROP = (
+    '{mode}: пропускная способность {value:.1f} запр./с, '
+    'эталон {baseline:.1f}'
+)
+RSS_GROWTH = '{mode}: пиковая память {value:.0f} МБ, эталон {baseline:.0f} МБ'
+
+
+def run_once(main, create_session, mode, cli_args):
+    session = create_session(cli_args)
+    session.cache.clear()
+    shutil.rmtree(main.BASE_DIR / 'downloads', ignore_errors=True)
+    start = time.perf_counter()
+    results = main.MODE_TO_FUNCTION[mode](session, cli_args)
+    if results is not None:
+        list(results)
+    return time.perf_counter() - start
+
+
+def run_mode(mode, base_url, workers, repeat, queue):
+    """Замер одного режима; выполняется в дочернем процессе."""
+    sys.stderr = open(os.devnull, 'w')
+    logging.disable(logging.WARNING)
+    import main
+    from metrics import RunProfile
+    from sessions import create_session
+
+    workdir = tempfile.mkdtemp()
+    os.chdir(workdir)
+    main.BASE_DIR = Path(workdir)
+    main.MAIN_DOC_URL = base_url + DOCS_PATH
+    main.PEP_URL = base_url + PEPS_PATH
+    timings = []
+    for _ in range(repeat):
+        profile = RunProfile()
+        timings.append(run_once(
+            main,
+            create_session,
+            mode,
+            Namespace(workers=workers, run_profile=profile),
+        ))
+    shutil.rmtree(workdir, ignore_errors=True)
+    fetch = profile.summary()['fetch']
+    queue.put({
+        'seconds': statistics.median(timings),
+        'p50': fetch['p50'],
+        'p95': fetch['p95'],
+        'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    })
+
+
+def measure_mode(server, mode, workers, repeat):
+    server.reset()
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=run_mode,
+        args=(mode, server.base_url, workers, repeat, queue),
+    )
+    process.start()
+    result = queue.get()
+    process.join()
+    result['requests'] = server.requests / repeat
+    result['throughput'] = result['requests'] / result['seconds']
+    result['mb_per_second'] = (
+        server.bytes / repeat / 2**20 / result['seconds']
+    )
+    return result
+
+
+def regressions(results, baseline, threshold):
+    """Сообщения о режимах, которые стали хуже эталона."""
+    messages = []
+    for mode, result in results.items():
+        if mode not in baseline:
+            continue
+        expected = baseline[mode]
+        if result['throughput'] < expected['throughput'] * (1 - threshold):
+            messages.append(THROUGHPUT_DROP.format(
+                mode=mode,
+                value=result['throughput'],
+                baseline=expected['throughput'],
+            ))
+        if result['rss'] > expected['rss'] * (1 + threshold):
+            messages.append(RSS_GROWTH.format(
+                mode=mode, value=result['rss'], baseline=expected['rss']
+            ))
+    return messages
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--pep-count', type=int, default=PEP_COUNT)
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    return parser.parse_args()
+
+
+def run():
+    args = parse_args()
+    with serve_site(args.pep_count) as server:
+        results = {
+            mode: measure_mode(server, mode, args.workers, args.repeat)
+            for mode in args.modes
+        }
+    print_table(
+        (
+            'Режим', 'Запросов', 'Время, с', 'Запр./с', 'МБ/с',
+            'p50, мс', 'p95, мс', 'Пик RSS, МБ',
+        ),
+        [
+            (
+                mode,
+                f'{result["requests"]:.0f}',
+                f'{result["seconds"]:.2f}',
+                f'{result["throughput"]:.1f}',
+                f'{result["mb_per_second"]:.1f}',
+                f'{result["p50"] * 1000:.1f}',
+                f'{result["p95"] * 1000:.1f}',
+                f'{result["rss"]:.0f}',
+            )
+            for mode, result in results.items()
+        ]
+    )
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2))
+        return
+    if not args.baseline.exists():
+        return
+    messages = regressions(
+        results, json.loads(args.baseline.read_text()), args.threshold
+    )
+    for message in messages:
+        print(message)
+    if messages:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    run()
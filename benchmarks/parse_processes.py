@@ -0,0 +1,107 @@
+"""Разбор страниц PEP в потоках и в пуле процессов.
+
+Страницы проходят тот же путь, что в режиме pep: map_pages вызывает
+main.get_pep_status, который загружает страницу через get_page_data
+и разбирает её в своём потоке или, с --parse-processes, в пуле
+процессов. Страницы из `tests/fixture_data` отдаёт адаптер
+requests_mock, так что загрузка почти ничего не стоит и замер
+показывает разбор. Ускорение считается относительно -w 1 без пула;
+запуск процессов пула в замер не входит. Разбор в нескольких потоках
+упирается в GIL, в процессах — в число ядер.
+
+Запуск из корня репозитория:
+
+    python benchmarks/parse_processes.py
+"""
+import contextlib
+import io
+import multiprocessing
+import os
+import time
+from argparse import Namespace
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import requests
+import requests_mock
+from common import print_table
+
+import main
+from tests.fixture_data import pages
+from utils import ParseOptions, map_pages
+
+PAGE_COUNT = 200
+SECTION_COUNT = 60
+THREADS = 4
+PEP_PAGE_URL = 'https://peps.python.org/pep-{number:04d}/'
+
+
+def pep_session():
+    adapter = requests_mock.Adapter()
+    for number in range(1, PAGE_COUNT + 1):
+        adapter.register_uri(
+            'GET',
+            PEP_PAGE_URL.format(number=number),
+            text=pages.pep_page(number, SECTION_COUNT),
+            headers={'Content-Type': 'text/html; charset=utf-8'},
+        )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    return session
+
+
+def parse_all(session, links, cli_args, pool=None):
+    start = time.perf_counter()
+    with contextlib.redirect_stderr(io.StringIO()):
+        statuses = [
+            status for _, status in map_pages(
+                session,
+                partial(main.get_pep_status, options=ParseOptions(pool=pool)),
+                links,
+                cli_args
+            )
+        ]
+    return time.perf_counter() - start, statuses
+
+
+def run():
+    session = pep_session()
+    links = [
+        PEP_PAGE_URL.format(number=number)
+        for number in range(1, PAGE_COUNT + 1)
+    ]
+    cores = os.cpu_count()
+    runs = [(1, None), (THREADS, None)]
+    runs.extend((1, count) for count in sorted({1, 2, 4, cores}))
+    rows = []
+    serial_time = expected = None
+    for workers, processes in runs:
+        cli_args = Namespace(workers=workers, parse_processes=processes)
+        if processes is None:
+            seconds, statuses = parse_all(session, links, cli_args)
+        else:
+            with ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context('spawn')
+            ) as pool:
+                parse_all(session, links[:processes * 2], cli_args, pool)
+                seconds, statuses = parse_all(
+                    session, links, cli_args, pool
+                )
+        if serial_time is None:
+            serial_time, expected = seconds, statuses
+        assert statuses == expected
+        rows.append((
+            workers,
+            processes or '—',
+            f'{PAGE_COUNT / seconds:.1f}',
+            f'{serial_time / seconds:.2f}',
+        ))
+    print(f'Ядер процессора: {cores}')
+    print_table(
+        ('Потоков (-w)', 'Процессов', 'Страниц/с', 'Ускорение'), rows
+    )
+
+
+if __name__ == '__main__':
+    run()
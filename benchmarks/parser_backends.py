@@ -0,0 +1,66 @@
+"""Скорость и память парсеров HTML на копиях страниц сайтов.
+
+Для каждого установленного парсера считает страницы в секунду и
+пиковую память Python-объектов (tracemalloc) при извлечении данных,
+а также проверяет, что извлечённые таблицы совпадают.
+
+Запуск из корня репозитория:
+
+    python benchmarks/parser_backends.py
+"""
+from common import measure, print_table
+
+import main
+from constants import PARSER_BACKENDS
+from tests.fixture_data import pages
+from utils import make_soup, resolve_parser
+
+SECTION_COUNT = 60
+PAGES = (
+    (pages.pep_index(700), main.extract_pep_index),
+    *(
+        (pages.pep_page(number, SECTION_COUNT), main.extract_pep_status)
+        for number in range(1, 11)
+    ),
+    (pages.whats_new_index(['3.12', '3.11']), main.extract_whats_new_links),
+    *(
+        (
+            pages.whats_new_page(version, SECTION_COUNT),
+            main.extract_whats_new_article,
+        )
+        for version in ('3.12', '3.11', '3.10')
+    ),
+    (pages.MAIN_DOC_PAGE, main.extract_versions),
+    (pages.download_page(), main.extract_archive_links),
+)
+
+
+def extract_all(features):
+    return [
+        extract(make_soup(text, extract, features))
+        for text, extract in PAGES
+    ]
+
+
+def run():
+    backends = [
+        features for features in PARSER_BACKENDS
+        if resolve_parser(features) == features
+    ]
+    expected = extract_all(backends[0])
+    rows = []
+    for features in backends:
+        assert extract_all(features) == expected, (
+            f'Парсер {features} извлёк другие данные'
+        )
+        seconds, peak = measure(lambda: extract_all(features), repeat=5)
+        rows.append((
+            features,
+            f'{len(PAGES) / seconds:.1f}',
+            f'{peak / 1024:.0f}',
+        ))
+    print_table(('Парсер', 'Страниц/с', 'Пик памяти, КБ'), rows)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,66 @@
+"""Время и память разбора одной страницы: целиком и через SoupStrainer.
+
+Запуск из корня репозитория:
+
+    python benchmarks/parsing.py
+"""
+from common import measure, print_table
+
+from bs4 import BeautifulSoup
+
+import main
+from tests.fixture_data import pages
+from utils import make_soup
+
+SECTION_COUNT = 60
+
+CASES = (
+    ('PEP', pages.pep_page(8, SECTION_COUNT), main.extract_pep_status),
+    (
+        'PEP index',
+        pages.pep_index(700),
+        main.extract_pep_index,
+    ),
+    (
+        "What's New",
+        pages.whats_new_page('3.12', SECTION_COUNT),
+        main.extract_whats_new_article,
+    ),
+)
+
+
+def full_parse(text, extract):
+    return extract(BeautifulSoup(text, 'html.parser'))
+
+
+def strained_parse(text, extract):
+    return extract(make_soup(text, extract))
+
+
+def run():
+    rows = []
+    for name, text, extract in CASES:
+        assert full_parse(text, extract) == strained_parse(text, extract)
+        full_time, full_peak = measure(lambda: full_parse(text, extract))
+        strained_time, strained_peak = measure(
+            lambda: strained_parse(text, extract)
+        )
+        rows.append((
+            name,
+            f'{len(text) / 1024:.0f}',
+            f'{full_time * 1000:.2f}',
+            f'{strained_time * 1000:.2f}',
+            f'{full_peak / 1024:.0f}',
+            f'{strained_peak / 1024:.0f}',
+        ))
+    print_table(
+        (
+            'Страница', 'Размер, КБ', 'Целиком, мс', 'Strainer, мс',
+            'Память целиком, КБ', 'Память strainer, КБ',
+        ),
+        rows
+    )
+
+
+if __name__ == '__main__':
+    run()
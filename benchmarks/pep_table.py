@@ -0,0 +1,100 @@
+"""Память на карточку PEP: список словарей и таблица по столбцам.
+
+Карточки извлекаются из упрощённых страниц PEP функцией
+main.extract_pep_metadata и хранятся строками JSON, как в журнале
+обхода. Из них строятся список словарей (по словарю на PEP), список
+кортежей и ColumnTable из main.pep_table; память каждого варианта
+считается по tracemalloc после построения, временные объекты к этому
+моменту уже освобождены. Отдельно замеряется подсчёт PEP по статусам.
+
+Запуск из корня репозитория:
+
+    python benchmarks/pep_table.py
+    python benchmarks/pep_table.py --pep-count 2000
+"""
+import argparse
+import json
+import tracemalloc
+from collections import Counter
+
+from common import measure, print_table
+
+import main
+from tests.fixture_data import pages
+from utils import make_soup
+
+PEP_COUNT = 700
+REPEAT = 20
+
+
+def load_records(count):
+    records = []
+    for number in range(1, count + 1):
+        soup = make_soup(pages.pep_page(number), main.extract_pep_metadata)
+        records.append(json.dumps(
+            (number, *main.extract_pep_metadata(soup)), ensure_ascii=False
+        ))
+    return records
+
+
+def build_dicts(lines):
+    header = main.pep_table().header
+    return [dict(zip(header, json.loads(line))) for line in lines]
+
+
+def build_tuples(lines):
+    return [tuple(json.loads(line)) for line in lines]
+
+
+def build_table(lines):
+    table = main.pep_table()
+    for line in lines:
+        table.append(json.loads(line))
+    return table
+
+
+def retained(build, lines):
+    """Результат build(lines) и память, которую он занимает, байт."""
+    tracemalloc.start()
+    result = build(lines)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def run(count):
+    lines = load_records(count)
+    dicts, dicts_size = retained(build_dicts, lines)
+    tuples, tuples_size = retained(build_tuples, lines)
+    table, table_size = retained(build_table, lines)
+    assert [tuple(record.values()) for record in dicts] == tuples
+    assert table.count_by('Статус') == dict(
+        Counter(record['Статус'] for record in dicts).most_common()
+    )
+    dicts_time, _ = measure(
+        lambda: Counter(record['Статус'] for record in dicts), REPEAT
+    )
+    table_time, _ = measure(lambda: table.count_by('Статус'), REPEAT)
+    print_table(
+        ('Хранение', 'Байт', 'Байт на PEP', 'Статусы, мкс'),
+        (
+            ('Список словарей', dicts_size, f'{dicts_size / count:.0f}',
+             f'{dicts_time * 10**6:.0f}'),
+            ('Список кортежей', tuples_size, f'{tuples_size / count:.0f}',
+             ''),
+            ('ColumnTable', table_size, f'{table_size / count:.0f}',
+             f'{table_time * 10**6:.0f}'),
+            ('ColumnTable.nbytes()', table.nbytes(),
+             f'{table.nbytes() / count:.0f}', ''),
+        )
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pep-count', type=int, default=PEP_COUNT)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    run(parse_args().pep_count)
@@ -0,0 +1,131 @@
+"""Локальная замена docs.python.org и peps.python.org для замеров.
+
+Сервер отдаёт упрощённые копии страниц из `tests/fixture_data`
+по путям /docs/3/... и /peps/..., а также архивы документации,
+считает запросы и отданные байты и запоминает время первого запроса.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from tests.fixture_data import pages
+
+DOCS_PATH = '/docs/3/'
+PEPS_PATH = '/peps/'
+WHATS_NEW_VERSIONS = ('3.12', '3.11', '3.10', '3.9', '3.8', '3.7')
+SECTION_COUNT = 20
+ARCHIVE_SIZE = 4 * 2**20
+ARCHIVE_SUFFIXES = ('.zip', '.epub', '.bz2')
+LAST_MODIFIED = 'Tue, 05 Mar 2024 10:00:00 GMT'
+
+
+def site_pages(pep_count):
+    """Пути и содержимое страниц обоих сайтов."""
+    site = {
+        DOCS_PATH: pages.MAIN_DOC_PAGE,
+        DOCS_PATH + 'download.html': pages.download_page(),
+        DOCS_PATH + 'whatsnew/': pages.whats_new_index(WHATS_NEW_VERSIONS),
+        PEPS_PATH: pages.pep_index(pep_count),
+    }
+    for version in WHATS_NEW_VERSIONS:
+        site[f'{DOCS_PATH}whatsnew/{version}.html'] = (
+            pages.whats_new_page(version, SECTION_COUNT)
+        )
+    for number in range(1, pep_count + 1):
+        site[f'{PEPS_PATH}pep-{number:04d}/'] = (
+            pages.pep_page(number, SECTION_COUNT)
+        )
+    return {
+        path: body.encode('utf-8') for path, body in site.items()
+    }
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def respond(self, send_body):
+        self.server.mark_request()
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        path = urlsplit(self.path).path
+        if path.endswith(ARCHIVE_SUFFIXES):
+            content_type, body = 'application/zip', self.server.archive
+        elif path in self.server.pages:
+            content_type = 'text/html; charset=utf-8'
+            body = self.server.pages[path]
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Last-Modified', LAST_MODIFIED)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+            self.server.count(len(body))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SiteServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, pep_count, delay=0):
+        super().__init__(('127.0.0.1', 0), SiteHandler)
+        self.delay = delay
+        self.pages = site_pages(pep_count)
+        self.archive = b'PK' + b'\x00' * (ARCHIVE_SIZE - 2)
+        self._lock = threading.Lock()
+        self.reset()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address
+        return f'http://{host}:{port}'
+
+    def count(self, size):
+        with self._lock:
+            self.bytes += size
+
+    def mark_request(self):
+        """Считает запрос и запоминает время первого после reset().
+
+        Запрос считается при получении, а не после ответа: иначе
+        последний ответ замера мог бы попасть уже в следующий.
+        """
+        with self._lock:
+            self.requests += 1
+            if self.first_request is None:
+                self.first_request = time.perf_counter()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.bytes = 0
+            self.first_request = None
+
+
+@contextmanager
+def serve_site(pep_count, delay=0):
+    """Запускает сервер в фоновом потоке на свободном порту.
+
+    delay — задержка каждого ответа, с: имитация сетевой задержки.
+    """
+    server = SiteServer(pep_count, delay)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
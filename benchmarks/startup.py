@@ -0,0 +1,129 @@
+"""Время запуска парсера: импорт main и время до первого запроса.
+
+Импорт замеряется через `python -X importtime -c "import main"`:
+выводится общее время и самые тяжёлые модули, загружаемые при
+импорте. Время до первого запроса — от старта интерпретатора до
+момента, когда локальный сервер из `stand.py` получил первый запрос
+парсера, запущенного как из командной строки (`main.main()`).
+
+Запуск из корня репозитория:
+
+    python benchmarks/startup.py
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import BASE_DIR, print_table
+from stand import DOCS_PATH, PEPS_PATH, serve_site
+
+REPEAT = 5
+HEAVIEST = 8
+COMMANDS = (
+    ('--help', ['--help']),
+    ('latest-versions', ['latest-versions']),
+    ('pep', ['pep']),
+    ('whats-new --engine async', ['whats-new', '--engine', 'async']),
+)
+RUN_MAIN = '''
+import sys
+from pathlib import Path
+
+import configs
+import main
+
+workdir = Path.cwd()
+configs.LOG_DIR = workdir / 'log_dir'
+configs.LOG_FILE = configs.LOG_DIR / 'parser.log'
+main.BASE_DIR = workdir
+main.MAIN_DOC_URL = sys.argv[1] + {docs!r}
+main.PEP_URL = sys.argv[1] + {peps!r}
+sys.argv = ['main.py', *sys.argv[2:]]
+main.main()
+'''.format(docs=DOCS_PATH, peps=PEPS_PATH)
+
+
+def environment():
+    return {**os.environ, 'PYTHONPATH': str(BASE_DIR / 'src')}
+
+
+def import_times():
+    """Собственное и накопленное время импорта модулей, мкс.
+
+    Учитываются только модули, загруженные после site, то есть
+    импортом main, а не запуском интерпретатора.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import main'],
+        env=environment(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines()[1:]:
+        own, cumulative, name = line.split(':', 1)[1].split('|')
+        if name.strip() == 'site':
+            times.clear()
+            continue
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def first_request_time(server, args):
+    """Секунды от запуска процесса до первого запроса к серверу.
+
+    None, если команда не делает запросов.
+    """
+    server.reset()
+    with tempfile.TemporaryDirectory() as workdir:
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, '-c', RUN_MAIN, server.base_url, *args],
+            cwd=workdir,
+            env=environment(),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        total = time.perf_counter() - start
+    if server.first_request is None:
+        return None, total
+    return server.first_request - start, total
+
+
+def run():
+    times = statistics.median(
+        import_times()['main'][1] for _ in range(REPEAT)
+    )
+    print(f'Импорт main: {times / 1000:.1f} мс')
+    heaviest = sorted(
+        (
+            (name, cumulative) for name, (_, cumulative)
+            in import_times().items() if '.' not in name and name != 'main'
+        ),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:HEAVIEST]
+    print_table(
+        ('Модуль', 'Импорт, мс'),
+        [(name, f'{cumulative / 1000:.1f}') for name, cumulative in heaviest]
+    )
+    rows = []
+    with serve_site(pep_count=20) as server:
+        for name, args in COMMANDS:
+            runs = [first_request_time(server, args) for _ in range(REPEAT)]
+            first = [seconds for seconds, _ in runs if seconds is not None]
+            rows.append((
+                name,
+                f'{statistics.median(first) * 1000:.0f}' if first else '-',
+                f'{statistics.median(total for _, total in runs) * 1000:.0f}',
+            ))
+    print_table(('Команда', 'До первого запроса, мс', 'Всего, мс'), rows)
+
+
+if __name__ == '__main__':
+    run()
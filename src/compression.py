@@ -0,0 +1,87 @@
+import gzip
+import logging
+from importlib.util import find_spec
+
+from requests_cache.serializers import (
+    SerializerPipeline, Stage, pickle_serializer
+)
+
+from constants import (
+    DEFAULT_COMPRESSION_THRESHOLD, GZIP_COMPRESSION, NO_COMPRESSION,
+    ZSTD_COMPRESSION
+)
+
+ZSTD_NOT_INSTALLED = (
+    'Для сжатия zstd требуется пакет zstandard: pip install zstandard; '
+    'используется {fallback}'
+)
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+# Первый байт записи указывает, чем она сжата. Данные pickle
+# начинаются с байта 0x80, поэтому записи, сохранённые без сжатия
+# до появления этого формата, читаются как есть.
+PREFIXES = {
+    NO_COMPRESSION: b'R',
+    GZIP_COMPRESSION: b'G',
+    ZSTD_COMPRESSION: b'Z',
+}
+
+
+def resolve_compression(method):
+    """Возвращает method, если для него установлены пакеты.
+
+    Иначе пишет предупреждение и возвращает gzip из стандартной
+    библиотеки.
+    """
+    if method == ZSTD_COMPRESSION and find_spec('zstandard') is None:
+        logging.warning(ZSTD_NOT_INSTALLED.format(fallback=GZIP_COMPRESSION))
+        return GZIP_COMPRESSION
+    return method
+
+
+class Compressor:
+    """Стадия сериализации, сжимающая записи кеша.
+
+    Записи меньше threshold байт сохраняются без сжатия: на коротких
+    ответах оно почти ничего не даёт, а время тратит.
+    """
+
+    def __init__(
+        self, method=GZIP_COMPRESSION, threshold=DEFAULT_COMPRESSION_THRESHOLD
+    ):
+        self.method = method
+        self.threshold = threshold
+
+    def dumps(self, data):
+        if self.method == NO_COMPRESSION or len(data) < self.threshold:
+            return PREFIXES[NO_COMPRESSION] + data
+        if self.method == ZSTD_COMPRESSION:
+            import zstandard
+
+            return PREFIXES[ZSTD_COMPRESSION] + zstandard.ZstdCompressor(
+                level=ZSTD_LEVEL
+            ).compress(data)
+        return PREFIXES[GZIP_COMPRESSION] + gzip.compress(
+            data, compresslevel=GZIP_LEVEL
+        )
+
+    def loads(self, data):
+        prefix, body = data[:1], data[1:]
+        if prefix == PREFIXES[NO_COMPRESSION]:
+            return body
+        if prefix == PREFIXES[GZIP_COMPRESSION]:
+            return gzip.decompress(body)
+        if prefix == PREFIXES[ZSTD_COMPRESSION]:
+            import zstandard
+
+            return zstandard.ZstdDecompressor().decompress(body)
+        return data
+
+
+def compressed_serializer(method, threshold=DEFAULT_COMPRESSION_THRESHOLD):
+    """Сериализатор pickle для requests_cache со сжатием записей."""
+    return SerializerPipeline(
+        [*pickle_serializer.stages, Stage(Compressor(method, threshold))],
+        name=f'pickle-{method}',
+        is_binary=True,
+    )
@@ -1,11 +1,73 @@
 import argparse
 import logging
 from logging.handlers import RotatingFileHandler
+from pathlib import Path
 
 from constants import (
-    FILE_OUTPUT, LOG_DIR, LOG_DT_FORMAT, LOG_FILE, LOG_FORMAT, PRETTY_OUTPUT
+    ALL_VERSIONS, ASYNC_ENGINE, CACHE_BACKENDS, CACHE_COMPRESSIONS,
+    DEFAULT_BACKOFF, DEFAULT_COMPRESSION_THRESHOLD,
+    DEFAULT_DOWNLOAD_FORMATS, DEFAULT_HOST_CONNECTIONS, DEFAULT_JITTER,
+    DEFAULT_PARSED_CACHE_SIZE, DEFAULT_PARSER, DEFAULT_POOL_SIZE,
+    DEFAULT_REFRESH, DEFAULT_RETRIES, DEFAULT_SERVE_HOST,
+    DEFAULT_SERVE_PORT, DEFAULT_TIMEOUT, DEFAULT_WORKERS, DOWNLOAD_FORMATS,
+    FILE_OUTPUT, GZIP_COMPRESSION, JSONL_OUTPUT, LOG_DIR, LOG_DT_FORMAT,
+    LOG_FILE, LOG_FORMAT, NEVER_EXPIRE, PARQUET_OUTPUT, PARSER_BACKENDS,
+    PARSER_MODES, PRETTY_OUTPUT, SQLITE_CACHE, SQLITE_OUTPUT, SYNC_ENGINE,
+    TABLE_MODES
 )
 
+NOT_POSITIVE = 'Ожидалось целое число больше нуля, получено: {value}'
+BAD_CACHE_TTL = 'Ожидалось ШАБЛОН=СЕКУНДЫ, получено: {value}'
+NOT_POSITIVE_FLOAT = 'Ожидалось число больше нуля, получено: {value}'
+NEGATIVE = 'Ожидалось неотрицательное целое число, получено: {value}'
+NEGATIVE_FLOAT = 'Ожидалось неотрицательное число, получено: {value}'
+
+
+def positive_int(value):
+    """Преобразует аргумент в положительное целое число."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(NOT_POSITIVE.format(value=value))
+    return number
+
+
+def non_negative_int(value):
+    """Преобразует аргумент в неотрицательное целое число."""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(NEGATIVE.format(value=value))
+    return number
+
+
+def positive_float(value):
+    """Преобразует аргумент в положительное число."""
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(
+            NOT_POSITIVE_FLOAT.format(value=value)
+        )
+    return number
+
+
+def non_negative_float(value):
+    """Преобразует аргумент в неотрицательное число."""
+    number = float(value)
+    if not number >= 0:
+        raise argparse.ArgumentTypeError(NEGATIVE_FLOAT.format(value=value))
+    return number
+
+
+def cache_ttl(value):
+    """Разбирает пару ШАБЛОН=СЕКУНДЫ для срока хранения ответов."""
+    pattern, _, seconds = value.rpartition('=')
+    try:
+        seconds = int(seconds)
+    except ValueError:
+        seconds = None
+    if not pattern or seconds is None or seconds < NEVER_EXPIRE:
+        raise argparse.ArgumentTypeError(BAD_CACHE_TTL.format(value=value))
+    return pattern, seconds
+
 
 def configure_argument_parser(available_modes):
     """Конфигурирует параметры запуска парсера."""
@@ -21,12 +83,213 @@ def configure_argument_parser(available_modes):
         action="store_true",
         help="Очистка кеша"
     )
+    parser.add_argument(
+        "--cache-backend",
+        choices=CACHE_BACKENDS,
+        default=SQLITE_CACHE,
+        help="Хранилище кеша HTTP-ответов"
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        action="append",
+        type=cache_ttl,
+        metavar="PATTERN=SECONDS",
+        help="Срок хранения ответов для адресов по шаблону, с; "
+             f"{NEVER_EXPIRE} — хранить бессрочно"
+    )
+    parser.add_argument(
+        "--cache-compression",
+        choices=CACHE_COMPRESSIONS,
+        default=GZIP_COMPRESSION,
+        help="Сжатие ответов в кеше (для zstd нужен пакет zstandard)"
+    )
+    parser.add_argument(
+        "--compression-threshold",
+        type=positive_int,
+        default=DEFAULT_COMPRESSION_THRESHOLD,
+        help="Сжимать записи кеша не меньше этого размера, байт"
+    )
+    parser.add_argument(
+        "--cache-max-size",
+        type=positive_int,
+        help="Максимальный размер кеша HTTP-ответов, МБ"
+    )
     parser.add_argument(
         "-o",
         "--output",
-        choices=(PRETTY_OUTPUT, FILE_OUTPUT),
+        choices=(
+            PRETTY_OUTPUT, FILE_OUTPUT, JSONL_OUTPUT, PARQUET_OUTPUT,
+            SQLITE_OUTPUT
+        ),
         help="Дополнительные способы вывода данных",
     )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=positive_int,
+        default=DEFAULT_WORKERS,
+        help="Количество потоков для загрузки страниц"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=(SYNC_ENGINE, ASYNC_ENGINE),
+        default=SYNC_ENGINE,
+        help="Движок загрузки страниц"
+    )
+    parser.add_argument(
+        "--host-connections",
+        type=positive_int,
+        default=DEFAULT_HOST_CONNECTIONS,
+        help="Одновременных запросов к одному хосту"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=positive_float,
+        help="Запросов в секунду к одному хосту"
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=positive_int,
+        default=DEFAULT_POOL_SIZE,
+        help="Размер пула соединений с одним хостом"
+    )
+    parser.add_argument(
+        "--no-keep-alive",
+        dest="keep_alive",
+        action="store_false",
+        help="Закрывать соединение после каждого запроса"
+    )
+    parser.add_argument(
+        "--retries",
+        type=non_negative_int,
+        default=DEFAULT_RETRIES,
+        help="Количество повторных попыток запроса"
+    )
+    parser.add_argument(
+        "--backoff",
+        type=non_negative_float,
+        default=DEFAULT_BACKOFF,
+        help="Множитель экспоненциальной задержки между попытками, с"
+    )
+    parser.add_argument(
+        "--jitter",
+        type=non_negative_float,
+        default=DEFAULT_JITTER,
+        help="Максимальная случайная добавка к задержке, с"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=positive_float,
+        default=DEFAULT_TIMEOUT,
+        help="Таймаут запроса, с"
+    )
+    parser.add_argument(
+        "-i",
+        "--incremental",
+        action="store_true",
+        help="Условные запросы: пропуск неизменившихся страниц PEP"
+    )
+    parser.add_argument(
+        "--no-parsed-cache",
+        dest="parsed_cache",
+        action="store_false",
+        help="Не использовать кеш извлечённых со страниц данных"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Продолжить прерванный обход PEP по журналу"
+    )
+    parser.add_argument(
+        "--no-checkpoint",
+        dest="checkpoint",
+        action="store_false",
+        help="Не вести журнал обработанных PEP"
+    )
+    parser.add_argument(
+        "--parsed-cache-size",
+        type=positive_int,
+        default=DEFAULT_PARSED_CACHE_SIZE,
+        help="Максимальный размер кеша извлечённых данных, МБ"
+    )
+    parser.add_argument(
+        "--parser-backend",
+        choices=PARSER_BACKENDS,
+        default=DEFAULT_PARSER,
+        help="Парсер HTML для BeautifulSoup"
+    )
+    parser.add_argument(
+        "--pep-metadata",
+        action="store_true",
+        help="Выгрузить карточки PEP целиком: название, автор, тип, "
+             "даты, версия Python, замены (режим pep)"
+    )
+    parser.add_argument(
+        "--parse-processes",
+        type=positive_int,
+        help="Разбирать страницы в N процессах, чтобы занять все ядра "
+             "(по умолчанию — в потоках загрузки)"
+    )
+    parser.add_argument(
+        "--sha256",
+        help="Ожидаемая контрольная сумма архива (режим download, "
+             "только при загрузке одного архива)"
+    )
+    parser.add_argument(
+        "--versions",
+        nargs="+",
+        metavar="VERSION",
+        help="Версии документации, например 3.12 3.11, или "
+             f"{ALL_VERSIONS} (режимы whats-new и download)"
+    )
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=DOWNLOAD_FORMATS,
+        default=DEFAULT_DOWNLOAD_FORMATS,
+        help="Форматы архивов документации (режим download)"
+    )
+    parser.add_argument(
+        "--bandwidth-limit",
+        type=positive_int,
+        help="Общее ограничение скорости загрузки архивов, КБ/с"
+    )
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        choices=PARSER_MODES,
+        default=TABLE_MODES,
+        metavar="MODE",
+        help="Режимы для одновременного запуска (команда all), "
+             f"по умолчанию {' '.join(TABLE_MODES)}"
+    )
+    parser.add_argument(
+        "--host",
+        default=DEFAULT_SERVE_HOST,
+        help="Адрес HTTP-сервера с результатами (команда serve)"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_SERVE_PORT,
+        help="Порт HTTP-сервера с результатами (команда serve)"
+    )
+    parser.add_argument(
+        "--refresh",
+        type=positive_int,
+        default=DEFAULT_REFRESH,
+        help="Период обновления результатов, с (команда serve)"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Вывести в лог время загрузки и разбора страниц"
+    )
+    parser.add_argument(
+        "--profile-dump",
+        type=Path,
+        help="Сохранить профиль запуска в JSON-файл"
+    )
     return parser
 
 
@@ -44,3 +307,5 @@ def configure_logging():
         level=logging.INFO,
         handlers=(rotating_handler, logging.StreamHandler()),
     )
+    # httpx пишет в INFO строку на каждый запрос: сотни строк за обход PEP.
+    logging.getLogger('httpx').setLevel(logging.WARNING)
@@ -5,6 +5,9 @@ MAIN_DOC_URL = 'https://docs.python.org/3/'
 PEP_URL = 'https://peps.python.org/'
 DOWNLOADS_URL = 'download.html'
 WHATSNEW_URL = 'whatsnew/'
+INDEX_PAGE = 'index.html'
+# Хосты, где путь без расширения и он же с `/` — одна страница.
+DIRECTORY_HOSTS = ('docs.python.org', 'peps.python.org')
 
 # dirs and files
 BASE_DIR = Path(__file__).parent
@@ -12,11 +15,89 @@ LOG_DIR = BASE_DIR / "log_dir"
 LOG_FILE = LOG_DIR / "parser.log"
 DOWNLOADS_DIR = 'downloads'
 RESULTS_DIR = "results"
+SQLITE_FILE = 'results.sqlite'
+HTTP_CACHE_NAME = 'http_cache'
+CACHE_ACCESS_FILE = 'http_cache_access.sqlite'
+ASYNC_CACHE_FILE = 'async_cache.sqlite'
+STATE_FILE = 'pep_state.sqlite'
+PARSED_CACHE_FILE = 'parsed_cache.sqlite'
+CHECKPOINT_FILE = 'pep_checkpoint.jsonl'
 
 # constants
 LOG_FORMAT = '"%(asctime)s - [%(levelname)s] - %(message)s"'
 LOG_DT_FORMAT = "%d.%m.%Y %H:%M:%S"
 DATETIME_FORMAT = '%Y-%m-%d_%H-%M-%S'
+DEFAULT_WORKERS = 1
+OUTPUT_BATCH_SIZE = 500
+DEFAULT_PARSED_CACHE_SIZE = 50
+EXTRACTOR_VERSION = 2
+PROFILE_PERCENTILES = (50, 95, 99)
+PROFILE_SLOWEST = 5
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_FORMATS = {
+    'pdf-a4': 'pdf-a4.zip',
+    'pdf-a4-tar': 'pdf-a4.tar.bz2',
+    'pdf-letter': 'pdf-letter.zip',
+    'pdf-letter-tar': 'pdf-letter.tar.bz2',
+    'html': 'html.zip',
+    'html-tar': 'html.tar.bz2',
+    'text': 'text.zip',
+    'text-tar': 'text.tar.bz2',
+    'epub': '.epub',
+}
+ALL_VERSIONS = 'all'
+DEFAULT_DOWNLOAD_FORMATS = ('pdf-a4',)
+PARTIAL_SUFFIX = '.part'
+DEFAULT_PARSER = 'html.parser'
+PARSER_BACKENDS = ('html.parser', 'lxml')
+DEFAULT_HOST_CONNECTIONS = 10
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_JITTER = 0.5
+DEFAULT_TIMEOUT = 30
+RETRY_STATUSES = (500, 502, 504)
+THROTTLE_STATUSES = (429, 503)
+
+SQLITE_CACHE = 'sqlite'
+MEMORY_CACHE = 'memory'
+CACHE_BACKENDS = (SQLITE_CACHE, 'filesystem', MEMORY_CACHE)
+NEVER_EXPIRE = -1
+NO_COMPRESSION = 'none'
+GZIP_COMPRESSION = 'gzip'
+ZSTD_COMPRESSION = 'zstd'
+CACHE_COMPRESSIONS = (NO_COMPRESSION, GZIP_COMPRESSION, ZSTD_COMPRESSION)
+DEFAULT_COMPRESSION_THRESHOLD = 1024
+# Ответы другого типа больше этого размера в кеш не попадают, байт.
+CACHE_BINARY_LIMIT = 2**20
+CACHEABLE_TYPES = ('text/', 'application/json', 'application/xml')
+HOUR = 60 * 60
+DAY = 24 * HOUR
+# Шаблоны адресов и сроки хранения ответов в кеше, с.
+# Срабатывает первый подходящий шаблон.
+DEFAULT_CACHE_TTLS = (
+    ('peps.python.org/pep-', 7 * DAY),
+    ('peps.python.org', HOUR),
+    ('docs.python.org', DAY),
+)
+MAX_RETRY_DELAY = 60
+PARSER_MODES = ('whats-new', 'latest-versions', 'download', 'pep')
+# Режимы, результат которых — таблица: их отдаёт serve и по умолчанию
+# запускает all.
+TABLE_MODES = ('pep', 'whats-new', 'latest-versions')
+DEFAULT_SERVE_HOST = '127.0.0.1'
+DEFAULT_SERVE_PORT = 8000
+# Период фонового обновления результатов в режиме serve, с.
+DEFAULT_REFRESH = 10 * 60
+SYNC_ENGINE = 'sync'
+ASYNC_ENGINE = 'async'
+# Поля карточки PEP, которые выгружаются с --pep-metadata.
+PEP_FIELDS = (
+    'Author', 'Status', 'Type', 'Created', 'Python-Version', 'Post-History',
+    'Replaces', 'Superseded-By',
+)
+# Имя файлов и таблиц с карточками PEP: итоги по статусам — под `pep`.
+PEP_METADATA_RESULTS = 'pep-metadata'
 EXPECTED_STATUS = {
     'A': ('Active', 'Accepted'),
     'D': ('Deferred',),
@@ -29,4 +110,7 @@ EXPECTED_STATUS = {
 }
 PRETTY_OUTPUT = 'pretty'
 FILE_OUTPUT = 'file'
+JSONL_OUTPUT = 'jsonl'
+PARQUET_OUTPUT = 'parquet'
+SQLITE_OUTPUT = 'sqlite'
 DEFAUT_OUTPUT = None
@@ -6,3 +6,8 @@ class ParserFindTagException(Exception):
 class FindLatestVersionException(Exception):
     """Вызывается, когда парсер не может найти документацию."""
     pass
+
+
+class DownloadException(Exception):
+    """Вызывается, когда загруженный файл не прошёл проверку."""
+    pass
@@ -0,0 +1,96 @@
+import threading
+from concurrent.futures import Future
+from urllib.parse import urlsplit, urlunsplit
+
+from url_normalize import url_normalize
+
+from constants import DIRECTORY_HOSTS, INDEX_PAGE
+
+
+def canonical_url(url):
+    """Единый вид адреса страницы.
+
+    Кроме нормализации url_normalize (регистр хоста, порт по умолчанию,
+    точки в пути, экранирование) отбрасывается якорь и `index.html`
+    в конце пути. На хостах DIRECTORY_HOSTS к пути без расширения
+    добавляется `/`: там это одна и та же страница, а на других
+    сайтах такие адреса могут вести на разные страницы.
+    """
+    scheme, netloc, path, query, _ = urlsplit(url_normalize(url))
+    if path.endswith('/' + INDEX_PAGE):
+        path = path[:-len(INDEX_PAGE)]
+    elif (
+        netloc in DIRECTORY_HOSTS
+        and '.' not in path.rsplit('/', 1)[-1]
+        and not path.endswith('/')
+    ):
+        path += '/'
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+def unique_urls(urls):
+    """Адреса без повторов с точностью до canonical_url, в том же порядке.
+
+    Из совпадающих адресов остаётся первый.
+    """
+    unique = {}
+    for url in urls:
+        unique.setdefault(canonical_url(url), url)
+    return list(unique.values())
+
+
+class Frontier:
+    """Сессия, через которую все режимы запрашивают страницы.
+
+    Адреса приводятся к canonical_url, а одновременные запросы одного
+    адреса с одинаковыми заголовками объединяются: в сеть уходит
+    первый, остальные потоки получают тот же ответ. Повторный запрос
+    уже загруженной страницы обслуживает кеш сессии. Запросы
+    с дополнительными аргументами (stream, params и т. п.)
+    и остальные методы сессии передаются ей без изменений.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.requested = 0
+        self.coalesced = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    def get(self, url, headers=None, **kwargs):
+        if kwargs:
+            return self.session.get(url, headers=headers, **kwargs)
+        url = canonical_url(url)
+        key = (url, tuple(sorted((headers or {}).items())))
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                future = self._in_flight[key] = Future()
+                self.requested += 1
+                owner = True
+        if not owner:
+            return future.result()
+        try:
+            response = self.session.get(url, headers=headers)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(response)
+            return response
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def prefetch(self, urls):
+        """Заранее загружает страницы, если сессия это поддерживает."""
+        if hasattr(self.session, 'prefetch'):
+            self.session.prefetch(
+                list(dict.fromkeys(map(canonical_url, urls)))
+            )
@@ -1,19 +1,37 @@
 import logging
 import re
+from argparse import Namespace
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from functools import partial
 from urllib.parse import urljoin
 
-import requests_cache
-from tqdm import tqdm
-
 from configs import configure_argument_parser, configure_logging
 from constants import (
-    BASE_DIR, EXPECTED_STATUS, MAIN_DOC_URL,
-    PEP_URL, DOWNLOADS_DIR, DOWNLOADS_URL, WHATSNEW_URL
+    ALL_VERSIONS, BASE_DIR, CHECKPOINT_FILE, DEFAULT_DOWNLOAD_FORMATS,
+    DEFAULT_PARSED_CACHE_SIZE, DEFAULT_PARSER, DEFAULT_REFRESH,
+    DEFAULT_SERVE_HOST, DEFAULT_SERVE_PORT, DEFAULT_WORKERS, DEFAUT_OUTPUT,
+    DOWNLOADS_DIR, DOWNLOADS_URL, DOWNLOAD_FORMATS, EXPECTED_STATUS,
+    MAIN_DOC_URL, PARSED_CACHE_FILE, PEP_FIELDS, PEP_METADATA_RESULTS,
+    PEP_URL, STATE_FILE, TABLE_MODES, WHATSNEW_URL
 )
 from exceptions import FindLatestVersionException
+from extraction import (
+    ExtractionPlan, Field, attribute, compiled, definition, following
+)
+from frontier import Frontier, canonical_url, unique_urls
+from metrics import RunProfile
 from outputs import control_output
-from utils import find_tag, get_soup
+from storage import Checkpoint, PageStateStore, ParsedCache
+from table import (
+    CategoryColumn, ColumnTable, DateColumn, IntColumn, TextColumn
+)
+from throttling import TokenBucket
+from utils import (
+    ParseOptions, get_page_data, is_up_to_date, map_pages, parses,
+    resolve_parser, stream_download
+)
 
 UNEXPECTED_STATUS = (
     '\nНесовпадающие статусы:'
@@ -21,105 +39,351 @@ UNEXPECTED_STATUS = (
     '\nОжидаемые статусы: {preview_status}\n'
 )
 BROKEN_URL = 'Адрес {link} не вернул ожидаемый ответ'
-SUCCESS_SAVE = 'Архив был загружен и сохранён: {path}'
+SUCCESS_SAVE = 'Архив был загружен и сохранён: {path}, SHA-256 {digest}'
+UP_TO_DATE = 'Архив {path} не изменился, загрузка пропущена'
+NO_ARCHIVE = 'На странице загрузок нет архива в формате {format}'
 START = 'Парсер запущен!'
 FINISH = 'Парсер завершил работу.'
 ARGS = 'Аргументы командной строки: {args}'
 ERROR = 'Во время исполнения скрипта произошла ошибка: {error}'
 NOT_FOUND = 'Ничего не нашлось'
+NO_VERSIONS = 'На странице документации нет версий {versions}'
+SHA256_SKIPPED = (
+    '--sha256 проверяет один архив, а выбрано {count}: '
+    'контрольные суммы не проверяются'
+)
+CACHE_TRIMMED = 'Из кеша HTTP-ответов вытеснено записей: {count}'
+NO_LIMIT = 'нет'
+PROFILE_SAVED = 'Профиль запуска сохранён в {path}'
+FRONTIER_STATS = (
+    'Запрошено адресов: {requested}, объединено одновременных '
+    'запросов: {coalesced}'
+)
+MODE_FAILED = 'Режим {mode} завершился с ошибкой: {error}'
+PEP_TABLE_SIZE = (
+    'Карточек PEP: {count}, в памяти {size} байт, {per_pep:.0f} на PEP'
+)
+SERVING = 'Результаты доступны по адресу {url}'
 
 
-def pep(session):
-    """Парсинг статусов PEP."""
-    statuses = defaultdict(int)
-    logs = []
-    for row in tqdm(
-            get_soup(
-                session, PEP_URL
-            ).select(
-                '#numerical-index tbody tr'
-            )):
-        status_tag, number_tag, *_ = row.find_all('td')
-        status = status_tag.text[1:]
-        preview_status = (EXPECTED_STATUS.get(status) if len(status)
-                          else EXPECTED_STATUS.get(''))
-        link = urljoin(
-            PEP_URL,
-            find_tag(
-                number_tag,
-                'a',
-                attrs={'class': 'pep reference internal'})['href']
-            )
-        try:
-            soup = get_soup(session, link)
-        except ConnectionError:
-            logs.append(BROKEN_URL.format(link=link))
-            continue
-        table = find_tag(
-            soup,
-            'dl',
-            attrs={'class': 'rfc2822 field-list simple'}
+PEP_INDEX_PLAN = ExtractionPlan(
+    '#numerical-index tbody tr',
+    (
+        Field(cell=1),
+        Field('a.pep.reference.internal', attribute('href'), cell=1),
+        Field(cell=0),
+    ),
+    cells='td'
+)
+# Разбор ограничен карточкой PEP (@parses extract_pep_status), поэтому
+# строка плана — вся страница.
+PEP_STATUS_PLAN = ExtractionPlan(None, (Field(get=definition('Status')),))
+PEP_TITLE_PLAN = ExtractionPlan(None, (Field('h1.page-title'),))
+PEP_FIELDS_PLAN = ExtractionPlan(
+    'dl.rfc2822.field-list.simple > dt', (Field(), Field(get=following('dd')))
+)
+PEP_TITLE = re.compile(r'^PEP \d+\s*[-–—]\s*')
+# Статус в кортеже extract_pep_metadata: первым идёт название.
+PEP_STATUS_COLUMN = 1 + PEP_FIELDS.index('Status')
+# Разбор страниц ограничен разделом и таблицами (@parses), поэтому
+# селекторы не повторяют условия на предков.
+WHATS_NEW_LINKS_PLAN = ExtractionPlan(
+    'div.toctree-wrapper li.toctree-l1 > a', (Field(get=attribute('href')),)
+)
+WHATS_NEW_ARTICLE_PLAN = ExtractionPlan(None, (
+    Field('h1'),
+    Field('dl', lambda tag: tag.text.replace('\n', ' ')),
+))
+ARCHIVE_LINKS_PLAN = ExtractionPlan('a[href]', (Field(get=attribute('href')),))
+VERSION_LISTS = 'div.sphinxsidebarwrapper ul'
+VERSION_LINKS = 'a'
+VERSION_STATUS = re.compile(r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)')
+VERSION = re.compile(r'\d+\.\d+')
+
+
+@parses(id='numerical-index')
+def extract_pep_index(soup):
+    """Номер, ссылка и статус в индексе из числового индекса PEP."""
+    return [
+        (number, urljoin(PEP_URL, href), status[1:])
+        for number, href, status in PEP_INDEX_PLAN.extract(soup)
+    ]
+
+
+@parses('dl', attrs={'class': 'rfc2822 field-list simple'})
+def extract_pep_status(soup):
+    """Статус из карточки PEP."""
+    status, = PEP_STATUS_PLAN.extract_one(soup)
+    return status
+
+
+@parses(['h1', 'dl'], class_=['page-title', 'rfc2822 field-list simple'])
+def extract_pep_metadata(soup):
+    """Название PEP и поля его карточки в порядке PEP_FIELDS.
+
+    Отсутствующие в карточке поля — пустые строки.
+    """
+    title, = PEP_TITLE_PLAN.extract_one(soup)
+    fields = {
+        name.strip().rstrip(':'): ' '.join(value.split())
+        for name, value in PEP_FIELDS_PLAN.extract(soup)
+    }
+    return (
+        PEP_TITLE.sub('', title.strip()),
+        *(fields.get(name, '') for name in PEP_FIELDS)
+    )
+
+
+def get_pep_metadata(session, link, options=ParseOptions()):
+    """Карточка PEP; None, если страница не загрузилась."""
+    try:
+        return tuple(
+            get_page_data(session, link, extract_pep_metadata, options)
+        )
+    except ConnectionError:
+        return None
+
+
+def get_pep_status(session, link, options=ParseOptions()):
+    """Парсинг статуса со страницы PEP.
+
+    Возвращает None, если страница не загрузилась.
+    """
+    try:
+        return get_page_data(session, link, extract_pep_status, options)
+    except ConnectionError:
+        return None
+
+
+def open_parse_options(cli_args):
+    """Хранилища для разбора страниц, выбранные в аргументах.
+
+    Без аргументов командной строки хранилища не используются.
+    Время загрузки и разбора пишется в cli_args.run_profile, если
+    профиль создан; страницы разбираются в пуле процессов
+    cli_args.parse_pool, если он создан.
+    """
+    state = None
+    cache = None
+    if getattr(cli_args, 'incremental', False):
+        state = PageStateStore(BASE_DIR / STATE_FILE)
+    if getattr(cli_args, 'parsed_cache', False):
+        cache = ParsedCache(
+            BASE_DIR / PARSED_CACHE_FILE,
+            getattr(
+                cli_args, 'parsed_cache_size', DEFAULT_PARSED_CACHE_SIZE
+            ) * 2**20
         )
-        pep_status = str(
-            table.find(string='Status').parent.find_next_sibling('dd').string
+    return ParseOptions(
+        state,
+        cache,
+        resolve_parser(
+            getattr(cli_args, 'parser_backend', DEFAULT_PARSER)
+        ),
+        getattr(cli_args, 'run_profile', None),
+        getattr(cli_args, 'parse_pool', None)
+    )
+
+
+def open_checkpoint(cli_args):
+    """Журнал обхода PEP: на диске, если он включён в аргументах."""
+    if not getattr(cli_args, 'checkpoint', False):
+        return Checkpoint()
+    return Checkpoint(
+        BASE_DIR / CHECKPOINT_FILE, getattr(cli_args, 'resume', False)
+    )
+
+
+def check_pep_status(link, pep_status, preview_status):
+    """Предупреждает о статусе, которого нет среди ожидаемых."""
+    if pep_status not in preview_status:
+        logging.warning(
+            UNEXPECTED_STATUS.format(
+                link=link,
+                pep_status=pep_status,
+                preview_status=preview_status
+            )
         )
-        statuses[pep_status] += 1
-        if pep_status not in preview_status:
-            logs.append(
-                UNEXPECTED_STATUS.format(
-                    link=link,
-                    pep_status=pep_status,
-                    preview_status=preview_status
-                )
+
+
+def crawl_peps(session, cli_args=None, metadata=False):
+    """Обход страниц PEP из числового индекса.
+
+    Генератор пар (номер, данные страницы): статус или, с metadata,
+    кортеж из extract_pep_metadata. Обработанные PEP записываются
+    в журнал, с --resume уже записанные PEP не загружаются повторно.
+    """
+    options = open_parse_options(cli_args)
+    peps = {}
+    for number, link, status in get_page_data(
+        session, PEP_URL, extract_pep_index, options
+    ):
+        peps[link] = (number, EXPECTED_STATUS.get(status) if len(status)
+                      else EXPECTED_STATUS.get(''))
+    field = 'metadata' if metadata else 'status'
+    with open_checkpoint(cli_args) as checkpoint:
+        pending = []
+        for link, (number, _) in peps.items():
+            if field in checkpoint.done.get(link, {}):
+                yield number, checkpoint.done[link][field]
+            else:
+                pending.append(link)
+        for link, data in map_pages(
+            session,
+            partial(
+                get_pep_metadata if metadata else get_pep_status,
+                options=options
+            ),
+            pending,
+            cli_args
+        ):
+            if data is None:
+                logging.warning(BROKEN_URL.format(link=link))
+                continue
+            number, preview_status = peps[link]
+            pep_status = data[PEP_STATUS_COLUMN] if metadata else data
+            checkpoint.add(
+                number, link, pep_status, data if metadata else None
+            )
+            check_pep_status(link, pep_status, preview_status)
+            yield number, data
+        checkpoint.finish()
+
+
+def pep_table():
+    """Пустая таблица карточек PEP с типизированными столбцами."""
+    return ColumnTable((
+        ('Номер', IntColumn('H')),
+        ('Название', TextColumn()),
+        ('Автор', TextColumn()),
+        ('Статус', CategoryColumn()),
+        ('Тип', CategoryColumn()),
+        ('Создан', DateColumn()),
+        ('Версия Python', CategoryColumn()),
+        ('Обсуждения', TextColumn()),
+        ('Заменяет', TextColumn()),
+        ('Заменён на', TextColumn()),
+    ))
+
+
+def collect_pep_table(session, cli_args=None):
+    """Карточки всех PEP в одной таблице по столбцам."""
+    table = pep_table()
+    for number, metadata in crawl_peps(session, cli_args, metadata=True):
+        table.append((number, *metadata))
+    return table
+
+
+def pep(session, cli_args=None):
+    """Парсинг статусов PEP.
+
+    Генератор: заголовок таблицы отдаётся сразу, итоги по статусам —
+    после обхода всех PEP. С --pep-metadata вместо итогов отдаются
+    карточки всех PEP, по строке на PEP.
+    """
+    if getattr(cli_args, 'pep_metadata', False):
+        table = collect_pep_table(session, cli_args)
+        logging.info(PEP_TABLE_SIZE.format(
+            count=len(table),
+            size=table.nbytes(),
+            per_pep=table.nbytes() / max(len(table), 1)
+        ))
+        yield table.header
+        for row in table.rows():
+            yield tuple(
+                '' if value is None
+                else value.isoformat() if isinstance(value, date)
+                else value
+                for value in row
             )
-    list(map(logging.warning, logs))
+        return
+    yield ('Статус', 'Количество')
+    statuses = defaultdict(int)
+    for _, pep_status in crawl_peps(session, cli_args):
+        statuses[pep_status] += 1
+    yield from statuses.items()
+    yield ('Всего', sum(statuses.values()))
+
+
+@parses(id='what-s-new-in-python')
+def extract_whats_new_links(soup):
+    """Ссылки на статьи из оглавления What's New."""
+    return [href for href, in WHATS_NEW_LINKS_PLAN.extract(soup)]
+
+
+@parses(['h1', 'dl'])
+def extract_whats_new_article(soup):
+    """Заголовок и авторы статьи What's New."""
+    return WHATS_NEW_ARTICLE_PLAN.extract_one(soup)
+
+
+def get_whats_new_row(session, link, options=ParseOptions()):
+    """Парсинг заголовка и авторов статьи.
+
+    Возвращает None, если страница не загрузилась.
+    """
+    try:
+        return (
+            link,
+            *get_page_data(session, link, extract_whats_new_article, options)
+        )
+    except ConnectionError:
+        return None
+
+
+def get_whats_new_links(session, whats_new_url, options=ParseOptions()):
+    """Ссылки на статьи со страницы What's New по адресу whats_new_url."""
     return [
-        ('Статус', 'Количество'),
-        *statuses.items(),
-        ('Всего', sum(statuses.values())),
+        urljoin(whats_new_url, href)
+        for href in get_page_data(
+            session, whats_new_url, extract_whats_new_links, options
+        )
     ]
 
 
-def whats_new(session):
-    """Парсинг обновлений документации."""
-    whats_new_url = urljoin(MAIN_DOC_URL, WHATSNEW_URL)
-    logs = []
-    results = [('Ссылка на статью', 'Заголовок', 'Редактор, Автор')]
-    for tag in tqdm(
-        get_soup(
-            session, whats_new_url
-        ).select(
-            '#what-s-new-in-python div.toctree-wrapper li.toctree-l1 > a'
-        )
+def whats_new(session, cli_args=None):
+    """Парсинг обновлений документации.
+
+    Генератор: строки отдаются по мере загрузки статей. Каждая статья
+    загружается один раз по каноническому адресу; одинаковые статьи
+    из документации разных версий разбираются один раз через кеш
+    разобранных данных.
+    """
+    yield ('Ссылка на статью', 'Заголовок', 'Редактор, Автор')
+    options = open_parse_options(cli_args)
+    links = {}
+    for _, version_links in map_pages(
+        session,
+        partial(get_whats_new_links, options=options),
+        [
+            urljoin(doc_url, WHATSNEW_URL)
+            for doc_url in get_doc_urls(session, cli_args, options)
+        ],
+        cli_args
     ):
-        try:
-            soup = get_soup(session, urljoin(whats_new_url, tag['href']))
-            results.append((
-                urljoin(whats_new_url, tag['href']),
-                find_tag(soup, 'h1').text,
-                find_tag(soup, 'dl').text.replace('\n', ' ')
-            ))
-        except ConnectionError:
-            logs.append(BROKEN_URL.format(link=tag['href']))
-    list(map(logging.warning, logs))
-    return results
+        for link in version_links:
+            links.setdefault(canonical_url(link), link)
+    for link, row in map_pages(
+        session,
+        partial(get_whats_new_row, options=options),
+        list(links.values()),
+        cli_args
+    ):
+        if row is None:
+            logging.warning(BROKEN_URL.format(link=link))
+            continue
+        yield row
 
 
-def latest_versions(session):
-    """Парсинг последней версии документации."""
-    for ul in get_soup(
-      session, MAIN_DOC_URL
-    ).select(
-      'div.sphinxsidebarwrapper ul'
-    ):
-        if 'All versions' not in ul.text:
-            raise FindLatestVersionException(NOT_FOUND)
-        a_tags = ul.find_all('a')
-        break
-    results = [('Ссылка на документацию', 'Версия', 'Статус')]
-    pattern = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
-    for a_tag in a_tags:
-        text_match = re.search(pattern, a_tag.text)
+@parses('div', attrs={'class': 'sphinxsidebarwrapper'})
+def extract_versions(soup):
+    """Ссылки, версии и статусы из списка версий документации."""
+    ul = compiled(VERSION_LISTS).select_one(soup)
+    if ul is None or 'All versions' not in ul.text:
+        raise FindLatestVersionException(NOT_FOUND)
+    results = []
+    for a_tag in compiled(VERSION_LINKS).select(ul):
+        text_match = VERSION_STATUS.search(a_tag.text)
         if text_match is not None:
             version, status = text_match.groups()
         else:
@@ -130,22 +394,116 @@ def latest_versions(session):
     return results
 
 
-def download(session):
-    """Загрузка документации в виде архива."""
-    downloads_url = urljoin(MAIN_DOC_URL, DOWNLOADS_URL)
-    soup = get_soup(session, downloads_url)
-    pdf_a4_link = soup.select_one(
-        'table.docutils a[href$="pdf-a4.zip"]'
-    )['href']
-    archive_url = urljoin(downloads_url, pdf_a4_link)
-    filename = archive_url.split('/')[-1]
+def latest_versions(session, cli_args=None):
+    """Парсинг последней версии документации."""
+    yield ('Ссылка на документацию', 'Версия', 'Статус')
+    yield from map(tuple, get_page_data(
+        session,
+        MAIN_DOC_URL,
+        extract_versions,
+        open_parse_options(cli_args)
+    ))
+
+
+def get_doc_urls(session, cli_args=None, options=ParseOptions()):
+    """Адреса документации версий, выбранных в --versions.
+
+    Список версий берётся с главной страницы документации, как в
+    режиме latest-versions. Без --versions — только MAIN_DOC_URL.
+    """
+    versions = getattr(cli_args, 'versions', None)
+    if not versions:
+        return [MAIN_DOC_URL]
+    doc_urls = [
+        link for link, version, _ in get_page_data(
+            session, MAIN_DOC_URL, extract_versions, options
+        )
+        if VERSION.fullmatch(version)
+        and (ALL_VERSIONS in versions or version in versions)
+    ]
+    if not doc_urls:
+        logging.warning(NO_VERSIONS.format(versions=' '.join(versions)))
+    return doc_urls
+
+
+@parses('table', attrs={'class': re.compile(r'\bdocutils\b')})
+def extract_archive_links(soup):
+    """Ссылки на архивы из таблицы загрузок документации."""
+    return [href for href, in ARCHIVE_LINKS_PLAN.extract(soup)]
+
+
+def download_archive(session, url, downloads_dir, sha256=None, limiter=None):
+    """Загружает архив, если локальная копия устарела."""
+    archive_path = downloads_dir / url.split('/')[-1]
+    if is_up_to_date(session, url, archive_path):
+        logging.info(UP_TO_DATE.format(path=archive_path))
+        return
+    digest = stream_download(
+        session, url, archive_path, sha256, limiter=limiter
+    )
+    logging.info(SUCCESS_SAVE.format(path=archive_path, digest=digest))
+
+
+def get_archive_links(session, downloads_url, options=ParseOptions()):
+    """Ссылки на архивы со страницы загрузок по адресу downloads_url."""
+    return get_page_data(
+        session, downloads_url, extract_archive_links, options
+    )
+
+
+def find_archive_urls(session, cli_args=None):
+    """Адреса архивов выбранных форматов для выбранных версий."""
+    options = open_parse_options(cli_args)
+    formats = getattr(cli_args, 'formats', DEFAULT_DOWNLOAD_FORMATS)
+    archive_urls = []
+    for downloads_url, links in map_pages(
+        session,
+        partial(get_archive_links, options=options),
+        [
+            urljoin(doc_url, DOWNLOADS_URL)
+            for doc_url in get_doc_urls(session, cli_args, options)
+        ],
+        cli_args
+    ):
+        for archive_format in formats:
+            suffix = DOWNLOAD_FORMATS[archive_format]
+            link = next(
+                (link for link in links if link.endswith(suffix)), None
+            )
+            if link is None:
+                logging.warning(NO_ARCHIVE.format(format=archive_format))
+                continue
+            archive_urls.append(urljoin(downloads_url, link))
+    return unique_urls(archive_urls)
+
+
+def download(session, cli_args=None):
+    """Загрузка документации в виде архивов выбранных форматов.
+
+    С --versions архивы всех выбранных версий загружаются параллельно.
+    --sha256 проверяется, только если выбран один архив.
+    """
+    archive_urls = find_archive_urls(session, cli_args)
     downloads_dir = BASE_DIR / DOWNLOADS_DIR
     downloads_dir.mkdir(exist_ok=True)
-    archive_path = downloads_dir / filename
-    response = session.get(archive_url)
-    with open(archive_path, 'wb') as file:
-        file.write(response.content)
-    logging.info(SUCCESS_SAVE.format(path=archive_path))
+    bandwidth_limit = getattr(cli_args, 'bandwidth_limit', None)
+    sha256 = getattr(cli_args, 'sha256', None)
+    if sha256 and len(archive_urls) != 1:
+        logging.warning(SHA256_SKIPPED.format(count=len(archive_urls)))
+        sha256 = None
+    fetch = partial(
+        download_archive,
+        session,
+        downloads_dir=downloads_dir,
+        sha256=sha256,
+        limiter=(
+            TokenBucket(bandwidth_limit * 1024) if bandwidth_limit else None
+        ),
+    )
+    with ThreadPoolExecutor(
+        max_workers=getattr(cli_args, 'workers', DEFAULT_WORKERS)
+    ) as executor:
+        list(executor.map(fetch, archive_urls))
 
 
 MODE_TO_FUNCTION = {
@@ -156,22 +514,198 @@ MODE_TO_FUNCTION = {
 }
 
 
+def cache_stats(session, cli_args=None):
+    """Состояние кеша HTTP-ответов."""
+    from sessions import cache_summary
+
+    yield ('Показатель', 'Значение')
+    yield from cache_summary(session)
+    max_size = getattr(cli_args, 'cache_max_size', None)
+    yield ('Ограничение, МБ', max_size if max_size else NO_LIMIT)
+
+
+def finish_refresh(session, cli_args=None):
+    """Обслуживание после каждого цикла обновлений serve.
+
+    Кеш HTTP-ответов ограничивается --cache-max-size, а профиль запуска
+    пишется в лог и начинается заново: serve работает долго, и иначе
+    кеш и профиль росли бы без ограничений.
+    """
+    from sessions import trim_cache
+
+    max_size = getattr(cli_args, 'cache_max_size', None)
+    if max_size:
+        evicted = trim_cache(session, max_size * 2**20)
+        logging.info(CACHE_TRIMMED.format(count=evicted))
+    profile = getattr(cli_args, 'run_profile', None)
+    if profile is not None:
+        report_profile(profile, cli_args)
+        profile.clear()
+
+
+def serve(session, cli_args=None):
+    """Локальный HTTP-сервер с результатами режимов в JSON.
+
+    Сессия, её пул соединений и кеши остаются открытыми между
+    обновлениями, которые идут в фоне каждые --refresh секунд.
+    После каждого цикла обновлений вызывается finish_refresh.
+    Работает до Ctrl+C.
+    """
+    from server import ResultServer
+
+    server = ResultServer(
+        (
+            getattr(cli_args, 'host', DEFAULT_SERVE_HOST),
+            getattr(cli_args, 'port', DEFAULT_SERVE_PORT),
+        ),
+        {
+            mode: partial(MODE_TO_FUNCTION[mode], session, cli_args)
+            for mode in TABLE_MODES
+        },
+        getattr(cli_args, 'refresh', DEFAULT_REFRESH),
+        partial(finish_refresh, session, cli_args),
+    )
+    logging.info(SERVING.format(url=server.url))
+    server.start_refresh()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+def results_name(cli_args, mode):
+    """Имя результатов режима: по нему называются файлы и таблицы.
+
+    Карточки PEP (--pep-metadata) сохраняются под своим именем, чтобы
+    не смешиваться с итогами по статусам.
+    """
+    if mode == 'pep' and getattr(cli_args, 'pep_metadata', False):
+        return PEP_METADATA_RESULTS
+    return mode
+
+
+def mode_args(cli_args, mode):
+    """Аргументы вывода результатов одного режима."""
+    return Namespace(**{
+        'output': DEFAUT_OUTPUT,
+        **(vars(cli_args) if cli_args is not None else {}),
+        'mode': results_name(cli_args, mode),
+    })
+
+
+def collect(function, session, cli_args):
+    """Результаты режима списком, чтобы режим работал в своём потоке."""
+    results = function(session, cli_args)
+    return None if results is None else list(results)
+
+
+def run_modes(session, cli_args=None):
+    """Одновременный запуск режимов --modes в одном процессе.
+
+    Режимы работают в отдельных потоках с общей сессией: страницы,
+    нужные нескольким режимам, загружаются один раз. Результаты
+    выводятся в порядке --modes, каждый — как при отдельном запуске
+    режима. Ошибка одного режима не останавливает остальные.
+    """
+    modes = getattr(cli_args, 'modes', TABLE_MODES)
+    with ThreadPoolExecutor(max_workers=len(modes)) as executor:
+        futures = [
+            (mode, executor.submit(
+                collect, MODE_TO_FUNCTION[mode], session, cli_args
+            ))
+            for mode in modes
+        ]
+        for mode, future in futures:
+            try:
+                results = future.result()
+            except Exception as error:
+                logging.exception(MODE_FAILED.format(mode=mode, error=error))
+                continue
+            if results is not None:
+                control_output(results, mode_args(cli_args, mode))
+
+
+# Служебные команды: запускаются так же, как режимы, но не парсят сайты
+# или, как serve и all, запускают режимы сами.
+COMMAND_TO_FUNCTION = {
+    'cache-stats': cache_stats,
+    'serve': serve,
+    'all': run_modes,
+}
+
+
+def open_profile(cli_args):
+    """Профиль запуска, если он запрошен в аргументах."""
+    if cli_args.profile or cli_args.profile_dump:
+        return RunProfile()
+    return None
+
+
+def open_parse_pool(cli_args):
+    """Пул процессов для разбора страниц, если он запрошен в аргументах.
+
+    Процессы запускаются методом spawn: к первому разбору в парсере
+    уже работают потоки загрузки, а fork процесса с потоками
+    небезопасен.
+    """
+    if not cli_args.parse_processes:
+        return None
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(
+        max_workers=cli_args.parse_processes,
+        mp_context=multiprocessing.get_context('spawn')
+    )
+
+
+def report_profile(profile, cli_args):
+    """Пишет сводку профиля в лог и, если нужно, в JSON-файл."""
+    logging.info(profile.report())
+    path = getattr(cli_args, 'profile_dump', None)
+    if path:
+        profile.dump(path)
+        logging.info(PROFILE_SAVED.format(path=path))
+
+
 def main():
     configure_logging()
     logging.info(START)
-    arg_parser = configure_argument_parser(MODE_TO_FUNCTION.keys())
+    arg_parser = configure_argument_parser(
+        [*MODE_TO_FUNCTION, *COMMAND_TO_FUNCTION]
+    )
     args = arg_parser.parse_args()
+    # Модули загрузки импортируются после разбора аргументов: --help
+    # и ошибки в аргументах не ждут импорта requests и requests_cache.
+    from sessions import create_session, trim_cache
+
     logging.info(ARGS.format(args=args))
+    args.run_profile = open_profile(args)
+    args.parse_pool = open_parse_pool(args)
     try:
-        session = requests_cache.CachedSession()
+        session = Frontier(create_session(args))
         if args.clear_cache:
             session.cache.clear()
         parser_mode = args.mode
-        results = MODE_TO_FUNCTION[parser_mode](session)
+        results = {**MODE_TO_FUNCTION, **COMMAND_TO_FUNCTION}[parser_mode](
+            session, args
+        )
         if results is not None:
-            control_output(results, args)
+            control_output(results, mode_args(args, parser_mode))
+        logging.info(FRONTIER_STATS.format(
+            requested=session.requested, coalesced=session.coalesced
+        ))
+        if args.cache_max_size:
+            evicted = trim_cache(session, args.cache_max_size * 2**20)
+            logging.info(CACHE_TRIMMED.format(count=evicted))
+        if args.run_profile is not None:
+            report_profile(args.run_profile, args)
     except Exception as error:
         logging.exception(ERROR.format(error=error))
+    if args.parse_pool is not None:
+        args.parse_pool.shutdown()
     logging.info(FINISH)
 
 
@@ -0,0 +1,140 @@
+import json
+import math
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+from constants import PROFILE_PERCENTILES, PROFILE_SLOWEST
+
+FetchRecord = namedtuple('FetchRecord', 'url seconds size from_cache status')
+ParseRecord = namedtuple('ParseRecord', 'url extractor seconds')
+
+REPORT_HEADER = 'Профиль запуска:'
+REPORT_REQUESTS = (
+    'Запросов: {requests}, из кеша: {cache_hits} ({hit_ratio:.0%}), '
+    'получено байт: {bytes}'
+)
+REPORT_TIMINGS = '{title}, мс: {values} (всего: {count})'
+REPORT_SLOWEST = 'Самые медленные адреса:'
+REPORT_URL = '  {seconds:.1f} мс  {url}'
+FETCH_TITLE = 'Загрузка'
+PARSE_TITLE = 'Разбор'
+
+
+def percentile(values, percent):
+    """Процентиль по методу ближайшего ранга."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(percent / 100 * len(ordered))
+    return ordered[max(rank, 1) - 1]
+
+
+class RunProfile:
+    """Время загрузки и разбора страниц за один запуск парсера.
+
+    Записи добавляются из рабочих потоков, поэтому доступ к ним
+    защищён блокировкой.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.fetches = []
+        self.parses = []
+
+    def clear(self):
+        """Удаляет накопленные записи."""
+        with self._lock:
+            self.fetches = []
+            self.parses = []
+
+    def record_fetch(self, url, seconds, response):
+        record = FetchRecord(
+            url,
+            seconds,
+            len(response.content),
+            bool(getattr(response, 'from_cache', False)),
+            response.status_code,
+        )
+        with self._lock:
+            self.fetches.append(record)
+
+    @contextmanager
+    def parsing(self, url, extractor):
+        """Измеряет время разбора страницы внутри блока with."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = ParseRecord(
+                url, extractor, time.perf_counter() - start
+            )
+            with self._lock:
+                self.parses.append(record)
+
+    def summary(self):
+        """Сводка в виде словаря, пригодного для JSON."""
+        with self._lock:
+            fetches = list(self.fetches)
+            parses = list(self.parses)
+        cache_hits = sum(record.from_cache for record in fetches)
+        slowest = sorted(
+            fetches, key=lambda record: record.seconds, reverse=True
+        )[:PROFILE_SLOWEST]
+        return {
+            'requests': len(fetches),
+            'cache_hits': cache_hits,
+            'hit_ratio': cache_hits / len(fetches) if fetches else 0.0,
+            'bytes': sum(record.size for record in fetches),
+            'parses': len(parses),
+            'fetch': self._percentiles(fetches),
+            'parse': self._percentiles(parses),
+            'slowest': [
+                {'url': record.url, 'seconds': record.seconds}
+                for record in slowest
+            ],
+        }
+
+    @staticmethod
+    def _percentiles(records):
+        seconds = [record.seconds for record in records]
+        return {
+            f'p{percent}': percentile(seconds, percent)
+            for percent in PROFILE_PERCENTILES
+        }
+
+    def report(self):
+        """Сводка в виде текста для лога."""
+        summary = self.summary()
+        lines = [REPORT_HEADER, REPORT_REQUESTS.format(**summary)]
+        for title, key, count in (
+            (FETCH_TITLE, 'fetch', summary['requests']),
+            (PARSE_TITLE, 'parse', summary['parses']),
+        ):
+            lines.append(REPORT_TIMINGS.format(
+                title=title,
+                values=', '.join(
+                    f'{name} {seconds * 1000:.1f}'
+                    for name, seconds in summary[key].items()
+                ),
+                count=count,
+            ))
+        lines.append(REPORT_SLOWEST)
+        lines.extend(
+            REPORT_URL.format(url=item['url'], seconds=item['seconds'] * 1000)
+            for item in summary['slowest']
+        )
+        return '\n'.join(lines)
+
+    def dump(self, path):
+        """Сохраняет сводку и все записи в JSON-файл."""
+        summary = self.summary()
+        with self._lock:
+            data = {
+                'summary': summary,
+                'fetches': [record._asdict() for record in self.fetches],
+                'parses': [record._asdict() for record in self.parses],
+            }
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(data, file, ensure_ascii=False, indent=2)
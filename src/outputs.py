@@ -1,54 +1,172 @@
 import csv
 import datetime as dt
+import json
 import logging
+import sqlite3
 from csv import unix_dialect
-
-from prettytable import PrettyTable
+from itertools import islice
 
 from constants import (
-    BASE_DIR, DATETIME_FORMAT, DEFAUT_OUTPUT, FILE_OUTPUT,
-    PRETTY_OUTPUT, RESULTS_DIR
+    BASE_DIR, DATETIME_FORMAT, DEFAUT_OUTPUT, FILE_OUTPUT, JSONL_OUTPUT,
+    OUTPUT_BATCH_SIZE, PARQUET_OUTPUT, PRETTY_OUTPUT, RESULTS_DIR,
+    SQLITE_FILE, SQLITE_OUTPUT
 )
 
 MESSAGE_SUCCESS_SAVE = 'Файл с результатами сохранён: {path}'
+PARQUET_NOT_INSTALLED = (
+    'Для вывода в Parquet требуется пакет pyarrow: pip install pyarrow'
+)
 
 
-def file_output(results, cli_args):
-    """Вывод результата в csv файл."""
+def results_path(cli_args, extension):
+    """Путь к файлу результатов вида <режим>_<дата>.<расширение>."""
     results_dir = BASE_DIR / RESULTS_DIR
     results_dir.mkdir(exist_ok=True)
-    parser_mode = cli_args.mode
-    now = dt.datetime.now()
-    now_formatted = now.strftime(DATETIME_FORMAT)
-    file_name = f"{parser_mode}_{now_formatted}.csv"
-    file_path = results_dir / file_name
+    now_formatted = dt.datetime.now().strftime(DATETIME_FORMAT)
+    return results_dir / f"{cli_args.mode}_{now_formatted}.{extension}"
+
+
+def batches(rows, size=None):
+    """Разбивает поток строк на списки длиной не больше size."""
+    size = size or OUTPUT_BATCH_SIZE
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def file_output(results, cli_args):
+    """Вывод результата в csv файл.
+
+    Строки записываются по мере поступления, поэтому при сбое
+    в файле остаётся всё, что успело обработаться.
+    """
+    file_path = results_path(cli_args, "csv")
+    with open(file_path, "w", encoding="utf-8") as f:
+        writer = csv.writer(f, dialect=unix_dialect)
+        for row in results:
+            writer.writerow(row)
+            f.flush()
+    logging.info(MESSAGE_SUCCESS_SAVE.format(path=file_path))
+
+
+def jsonl_output(results, cli_args):
+    """Вывод результата в файл JSON Lines.
+
+    Каждая строка — объект с ключами из заголовка таблицы.
+    """
+    rows = iter(results)
+    header = next(rows)
+    file_path = results_path(cli_args, "jsonl")
     with open(file_path, "w", encoding="utf-8") as f:
-        csv.writer(
-            f, dialect=unix_dialect
-        ).writerows(
-            results
+        for row in rows:
+            f.write(json.dumps(dict(zip(header, row)), ensure_ascii=False))
+            f.write("\n")
+            f.flush()
+    logging.info(MESSAGE_SUCCESS_SAVE.format(path=file_path))
+
+
+def parquet_output(results, cli_args):
+    """Вывод результата в файл Parquet.
+
+    Типы столбцов определяются по первой пачке строк,
+    каждая пачка записывается отдельной группой строк.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError(PARQUET_NOT_INSTALLED)
+    rows = iter(results)
+    header = next(rows)
+    file_path = results_path(cli_args, "parquet")
+    writer = None
+    for batch in batches(rows):
+        table = pyarrow.Table.from_pylist(
+            [dict(zip(header, row)) for row in batch],
+            schema=writer.schema if writer is not None else None
         )
+        if writer is None:
+            writer = pyarrow.parquet.ParquetWriter(file_path, table.schema)
+        writer.write_table(table)
+    if writer is None:
+        return
+    writer.close()
+    logging.info(MESSAGE_SUCCESS_SAVE.format(path=file_path))
+
+
+def sqlite_column(name, value):
+    """Описание столбца SQLite с типом по значению из первой строки."""
+    column_type = "INTEGER" if isinstance(value, int) else "TEXT"
+    return f'"{name}" {column_type}'
+
+
+def sqlite_output(results, cli_args):
+    """Вывод результата в таблицу SQLite с обновлением по ключу.
+
+    Таблица называется по режиму парсера, первый столбец — первичный
+    ключ: повторный запуск обновляет строки, а не дублирует их.
+    """
+    rows = iter(results)
+    header = next(rows)
+    results_dir = BASE_DIR / RESULTS_DIR
+    results_dir.mkdir(exist_ok=True)
+    file_path = results_dir / SQLITE_FILE
+    table = cli_args.mode.replace("-", "_")
+    columns = ", ".join(f'"{name}"' for name in header)
+    updates = ", ".join(
+        f'"{name}" = excluded."{name}"' for name in header[1:]
+    )
+    insert = (
+        f'INSERT INTO "{table}" ({columns}) '
+        f'VALUES ({", ".join("?" * len(header))}) '
+        f'ON CONFLICT ("{header[0]}") DO '
+        + (f"UPDATE SET {updates}" if updates else "NOTHING")
+    )
+    connection = sqlite3.connect(file_path)
+    with connection:
+        for number, batch in enumerate(batches(rows)):
+            if number == 0:
+                connection.execute(
+                    f'CREATE TABLE IF NOT EXISTS "{table}" ('
+                    + ", ".join(map(sqlite_column, header, batch[0]))
+                    + f', PRIMARY KEY ("{header[0]}"))'
+                )
+            connection.executemany(insert, batch)
+            connection.commit()
+    connection.close()
     logging.info(MESSAGE_SUCCESS_SAVE.format(path=file_path))
 
 
 def pretty_output(results, cli_args=None):
-    """Вывод результа в консоль в виде таблицы."""
+    """Вывод результа в консоль в виде таблицы.
+
+    Таблице нужна ширина всех столбцов, поэтому строки накапливаются.
+    """
+    from prettytable import PrettyTable
+
+    rows = iter(results)
     table = PrettyTable()
-    table.field_names = results[0]
+    table.field_names = next(rows)
     table.align = "l"
-    table.add_rows(results[1:])
+    table.add_rows(list(rows))
     print(table)
 
 
 def default_output(results, cli_args=None):
-    """Вывод результата в консоль"""
+    """Вывод результата в консоль по мере поступления строк."""
     for row in results:
-        print(*row)
+        print(*row, flush=True)
 
 
 OUTPUT_FORMAT = {
     PRETTY_OUTPUT: pretty_output,
     FILE_OUTPUT: file_output,
+    JSONL_OUTPUT: jsonl_output,
+    PARQUET_OUTPUT: parquet_output,
+    SQLITE_OUTPUT: sqlite_output,
     DEFAUT_OUTPUT: default_output
 }
 
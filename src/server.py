@@ -0,0 +1,141 @@
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from constants import DEFAULT_REFRESH
+
+REFRESH_FAILED = 'Не удалось обновить {name}: {error}'
+REFRESHED = 'Обновлено {name}: строк {count}'
+AFTER_REFRESH_FAILED = 'Ошибка после обновления таблиц: {error}'
+NOT_READY = 'Данные {name} ещё загружаются'
+UNKNOWN = 'Нет данных {name}'
+JSON_TYPE = 'application/json; charset=utf-8'
+
+
+def to_json(data):
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+class ResultHandler(BaseHTTPRequestHandler):
+    """GET / — список результатов, GET /<имя> — таблица в JSON."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        name = urlsplit(self.path).path.strip('/')
+        if not name:
+            self.send_json(HTTPStatus.OK, to_json(self.server.index()))
+            return
+        if name not in self.server.producers:
+            self.send_json(
+                HTTPStatus.NOT_FOUND, to_json({'error': UNKNOWN.format(
+                    name=name
+                )})
+            )
+            return
+        body = self.server.pages.get(name)
+        if body is None:
+            self.send_json(
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                to_json({'error': NOT_READY.format(name=name)}),
+                {'Retry-After': '5'},
+            )
+            return
+        self.send_json(HTTPStatus.OK, body)
+
+    def send_json(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', JSON_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        for header, value in (headers or {}).items():
+            self.send_header(header, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug(format, *args)
+
+
+class ResultServer(ThreadingHTTPServer):
+    """Локальный HTTP-сервер с результатами парсеров в JSON.
+
+    producers — словарь имя → функция без аргументов, возвращающая
+    таблицу (первая строка — заголовок). Таблицы обновляются в фоновом
+    потоке каждые refresh секунд и хранятся готовым JSON, так что
+    запрос к серверу не запускает парсер. Если обновление не удалось,
+    отдаётся прежняя таблица. after_refresh, если задана, вызывается
+    без аргументов после каждого обновления всех таблиц.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, address, producers, refresh=DEFAULT_REFRESH, after_refresh=None
+    ):
+        super().__init__(address, ResultHandler)
+        self.producers = producers
+        self.refresh_interval = refresh
+        self.after_refresh = after_refresh
+        self.pages = {}
+        self.updated = {}
+        self._stopped = threading.Event()
+        self._refresher = threading.Thread(
+            target=self._refresh_loop, daemon=True
+        )
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    def refresh(self, name):
+        """Пересчитывает таблицу name; ошибки пишутся в лог."""
+        try:
+            header, *rows = self.producers[name]()
+        except Exception as error:
+            logging.exception(REFRESH_FAILED.format(name=name, error=error))
+            return
+        updated = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        self.pages[name] = to_json({
+            'name': name,
+            'updated': updated,
+            'rows': [dict(zip(header, row)) for row in rows],
+        })
+        self.updated[name] = updated
+        logging.info(REFRESHED.format(name=name, count=len(rows)))
+
+    def refresh_all(self):
+        for name in self.producers:
+            if self._stopped.is_set():
+                return
+            self.refresh(name)
+        if self.after_refresh is None:
+            return
+        try:
+            self.after_refresh()
+        except Exception as error:
+            logging.exception(AFTER_REFRESH_FAILED.format(error=error))
+
+    def index(self):
+        return {
+            name: {'url': f'/{name}', 'updated': self.updated.get(name)}
+            for name in self.producers
+        }
+
+    def _refresh_loop(self):
+        while not self._stopped.is_set():
+            self.refresh_all()
+            self._stopped.wait(self.refresh_interval)
+
+    def start_refresh(self):
+        """Запускает фоновое обновление, первое — сразу."""
+        self._refresher.start()
+
+    def stop(self):
+        """Останавливает обновление и закрывает сокет сервера."""
+        self._stopped.set()
+        self.server_close()
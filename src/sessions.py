@@ -0,0 +1,625 @@
+import asyncio
+import json
+import random
+import socket
+import sqlite3
+import threading
+import time
+from fnmatch import fnmatch
+from functools import partial
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+
+from constants import (
+    ASYNC_CACHE_FILE, ASYNC_ENGINE, CACHEABLE_TYPES, CACHE_ACCESS_FILE,
+    CACHE_BINARY_LIMIT, DEFAULT_BACKOFF, DEFAULT_CACHE_TTLS,
+    DEFAULT_COMPRESSION_THRESHOLD, DEFAULT_HOST_CONNECTIONS,
+    DEFAULT_JITTER, DEFAULT_POOL_SIZE, DEFAULT_RETRIES, DEFAULT_TIMEOUT,
+    GZIP_COMPRESSION, HTTP_CACHE_NAME, MEMORY_CACHE, NEVER_EXPIRE,
+    RETRY_STATUSES, SQLITE_CACHE, SYNC_ENGINE
+)
+from storage import CacheAccessLog
+from throttling import HostScheduler
+
+ENGINE_NOT_INSTALLED = (
+    'Для асинхронного движка требуется пакет httpx: pip install httpx'
+)
+CACHEABLE_CODES = (200,)
+
+
+def build_response(url, status_code, headers, content, from_cache=False):
+    """Собирает объект requests.Response из сохранённых данных."""
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = content
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.from_cache = from_cache
+    return response
+
+
+class JitterRetry(Retry):
+    """Retry со случайной добавкой к экспоненциальной задержке."""
+
+    def __init__(self, *args, jitter=0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.jitter = jitter
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.jitter = self.jitter
+        return retry
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return backoff
+        return backoff + random.uniform(0, self.jitter)
+
+
+class TunedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter с таймаутом по умолчанию и TCP keep-alive.
+
+    Если передан scheduler (HostScheduler), запросы проходят через
+    него, а ответы 429 и 503 повторяются до throttle_retries раз.
+    """
+
+    def __init__(
+        self,
+        timeout=DEFAULT_TIMEOUT,
+        keep_alive=True,
+        scheduler=None,
+        throttle_retries=DEFAULT_RETRIES,
+        **kwargs
+    ):
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.scheduler = scheduler
+        self.throttle_retries = throttle_retries
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.keep_alive:
+            kwargs['socket_options'] = [
+                *HTTPConnection.default_socket_options,
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+            ]
+        super().init_poolmanager(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        if self.scheduler is None:
+            return super().send(request, **kwargs)
+        return self.scheduler.send(
+            request.url,
+            partial(super().send, request, **kwargs),
+            self.throttle_retries
+        )
+
+
+def url_expire_after(url, expire_after):
+    """Срок хранения ответа по первому подходящему шаблону адреса, с.
+
+    Шаблоны сравниваются так же, как urls_expire_after в
+    requests_cache: адрес без схемы с glob-шаблоном, продолженным `**`.
+    """
+    address = url.split('://')[-1]
+    for pattern, seconds in (expire_after or {}).items():
+        if fnmatch(address, pattern.split('://')[-1].rstrip('*') + '**'):
+            return seconds
+    return NEVER_EXPIRE
+
+
+class ResponseCache:
+    """Дисковый кеш ответов асинхронного движка.
+
+    Сроки хранения задаются, как у requests_cache, словарём
+    expire_after шаблон адреса -> секунды (см. cache_ttls). Для
+    вытеснения давно не использованных ответов (trim) хранится время
+    последнего обращения к каждому.
+    """
+
+    def __init__(self, path=ASYNC_CACHE_FILE, expire_after=None):
+        self.expire_after = expire_after
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            str(path), check_same_thread=False
+        )
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'url TEXT PRIMARY KEY, status INTEGER, '
+            'headers TEXT, content BLOB, saved REAL, accessed REAL)'
+        )
+        columns = {
+            row[1] for row in self._connection.execute(
+                'PRAGMA table_info(responses)'
+            )
+        }
+        # Кеш прежней версии: без времени сохранения ответы устаревшие.
+        for column in ('saved', 'accessed'):
+            if column not in columns:
+                self._connection.execute(
+                    f'ALTER TABLE responses ADD COLUMN {column} REAL'
+                )
+
+    def is_expired(self, url, saved, now=None):
+        seconds = url_expire_after(url, self.expire_after)
+        if seconds == NEVER_EXPIRE:
+            return False
+        return (now or time.time()) - (saved or 0) >= seconds
+
+    def get(self, url):
+        """Сохранённый ответ или None, если его нет или он устарел."""
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT status, headers, content, saved FROM responses '
+                'WHERE url = ?',
+                (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        status, headers, content, saved = row
+        if self.is_expired(url, saved):
+            return None
+        with self._lock, self._connection:
+            self._connection.execute(
+                'UPDATE responses SET accessed = ? WHERE url = ?',
+                (time.time(), url)
+            )
+        return build_response(
+            url, status, json.loads(headers), content, from_cache=True
+        )
+
+    def save(self, url, response):
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                'REPLACE INTO responses '
+                '(url, status, headers, content, saved, accessed) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (
+                    url,
+                    response.status_code,
+                    json.dumps(dict(response.headers)),
+                    response.content,
+                    now,
+                    now,
+                )
+            )
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM responses')
+
+    def _entries(self):
+        """Тройки (адрес, устарел ли ответ, размер) в порядке обращений."""
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT url, saved, LENGTH(content) FROM responses '
+                'ORDER BY COALESCE(accessed, 0)'
+            ).fetchall()
+        now = time.time()
+        return [
+            (url, self.is_expired(url, saved, now), size or 0)
+            for url, saved, size in rows
+        ]
+
+    def summary(self):
+        """Число ответов, из них устаревших, и общий размер в байтах."""
+        entries = self._entries()
+        return (
+            len(entries),
+            sum(expired for _, expired, _ in entries),
+            sum(size for _, _, size in entries),
+        )
+
+    def trim(self, max_size):
+        """Ограничивает размер кеша до max_size байт.
+
+        Сначала удаляются устаревшие ответы, затем давно не
+        использованные. Возвращает число вытесненных ответов.
+        """
+        entries = self._entries()
+        total = sum(size for _, _, size in entries)
+        evicted = []
+        for url, expired, size in sorted(
+            entries, key=lambda entry: not entry[1]
+        ):
+            if not expired and total <= max_size:
+                break
+            total -= size
+            evicted.append((url,))
+        with self._lock, self._connection:
+            self._connection.executemany(
+                'DELETE FROM responses WHERE url = ?', evicted
+            )
+        return len(evicted)
+
+
+async def next_chunk(chunks):
+    """Следующая часть асинхронного потока тела ответа."""
+    return await chunks.__anext__()
+
+
+class StreamedResponse:
+    """Ответ асинхронного движка, тело которого читается частями.
+
+    Повторяет ту часть requests.Response, которая нужна потоковой
+    загрузке: статус, заголовки, iter_content и закрытие ответа.
+    """
+
+    def __init__(self, session, reply):
+        self._session = session
+        self._reply = reply
+        self.url = str(reply.url)
+        self.status_code = reply.status_code
+        self.headers = CaseInsensitiveDict(reply.headers)
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def iter_content(self, chunk_size=1):
+        chunks = self._reply.aiter_bytes(chunk_size)
+        while True:
+            try:
+                yield self._session._run(next_chunk(chunks))
+            except StopAsyncIteration:
+                return
+
+    def close(self):
+        self._session._run(self._reply.aclose())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncSession:
+    """Сессия поверх httpx.AsyncClient.
+
+    Цикл событий работает в фоновом потоке, поэтому `get` можно
+    вызывать из любого потока, как у requests.Session. Число
+    одновременных соединений с одним хостом ограничено. С scheduler
+    (HostScheduler) соблюдается его ограничение скорости, а ответы
+    429 и 503 повторяются после паузы, которую просит хост.
+    """
+
+    def __init__(
+        self,
+        cache_path=ASYNC_CACHE_FILE,
+        expire_after=None,
+        host_connections=DEFAULT_HOST_CONNECTIONS,
+        transport=None,
+        pool_size=DEFAULT_POOL_SIZE,
+        keep_alive=True,
+        retries=DEFAULT_RETRIES,
+        timeout=DEFAULT_TIMEOUT,
+        scheduler=None,
+    ):
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError(ENGINE_NOT_INSTALLED)
+        self._httpx = httpx
+        self.cache = ResponseCache(cache_path, expire_after)
+        self._host_connections = host_connections
+        self._semaphores = {}
+        self._scheduler = scheduler
+        self._retries = retries
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, daemon=True
+        )
+        self._thread.start()
+        limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size if keep_alive else 0,
+        )
+        if transport is None:
+            transport = httpx.AsyncHTTPTransport(
+                retries=retries, limits=limits
+            )
+        self._client = self._run(self._create_client(transport, timeout))
+
+    async def _create_client(self, transport, timeout):
+        return self._httpx.AsyncClient(
+            transport=transport, timeout=timeout, follow_redirects=True
+        )
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(
+            coroutine, self._loop
+        ).result()
+
+    def _semaphore(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(
+                self._host_connections
+            )
+        return self._semaphores[host]
+
+    async def _fetch(self, url, headers=None):
+        use_cache = 'no-store' not in (headers or {}).get(
+            'Cache-Control', ''
+        )
+        cached = self.cache.get(url) if use_cache else None
+        if cached is not None:
+            return cached
+        reply = await self._send(self._client.get, url, headers)
+        response = build_response(
+            str(reply.url), reply.status_code, reply.headers, reply.content
+        )
+        if use_cache and response.status_code in CACHEABLE_CODES:
+            self.cache.save(url, response)
+        return response
+
+    async def _fetch_all(self, urls):
+        return await asyncio.gather(
+            *(self._fetch(url) for url in urls), return_exceptions=True
+        )
+
+    async def _open_stream(self, url, headers=None):
+        return await self._client.send(
+            self._client.build_request('GET', url, headers=headers),
+            stream=True
+        )
+
+    async def _stream(self, url, headers=None):
+        return StreamedResponse(
+            self, await self._send(self._open_stream, url, headers)
+        )
+
+    def get(self, url, headers=None, stream=False, **kwargs):
+        """Загружает страницу, используя дисковый кеш.
+
+        Заголовок `Cache-Control: no-store` отключает кеш для запроса.
+        С stream=True ответ не кешируется, а тело читается частями
+        через iter_content.
+        """
+        if stream:
+            return self._run(self._stream(url, headers))
+        return self._run(self._fetch(url, headers))
+
+    async def _request(self, method, url, headers):
+        async with self._semaphore(url):
+            if self._scheduler is not None:
+                await asyncio.sleep(self._scheduler.reserve(url))
+            try:
+                return await method(url, headers=headers)
+            except self._httpx.HTTPError as error:
+                raise requests.ConnectionError(error)
+
+    async def _send(self, method, url, headers=None):
+        if self._scheduler is None:
+            return await self._request(method, url, headers)
+        for attempt in range(self._retries + 1):
+            reply = await self._request(method, url, headers)
+            throttled = self._scheduler.feedback(
+                url, reply.status_code, reply.headers.get('Retry-After')
+            )
+            if not throttled or attempt == self._retries:
+                return reply
+            await reply.aclose()
+
+    async def _head(self, url, headers=None):
+        reply = await self._send(self._client.head, url, headers)
+        return build_response(
+            str(reply.url), reply.status_code, reply.headers, b''
+        )
+
+    def head(self, url, headers=None, **kwargs):
+        """HEAD-запрос в обход кеша."""
+        return self._run(self._head(url, headers))
+
+    def prefetch(self, urls):
+        """Одновременно загружает страницы в кеш.
+
+        Ошибки не выбрасываются: они повторятся при вызове `get`.
+        """
+        self._run(self._fetch_all(list(urls)))
+
+    def close(self):
+        self._run(self._client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+def cache_ttls(cli_args=None):
+    """Сроки хранения ответов по шаблонам адресов.
+
+    Шаблоны из --cache-ttl проверяются раньше шаблонов по умолчанию.
+    """
+    expire_after = {}
+    for pattern, seconds in (
+        *(getattr(cli_args, 'cache_ttl', None) or ()), *DEFAULT_CACHE_TTLS
+    ):
+        expire_after.setdefault(pattern, seconds)
+    return expire_after
+
+
+def is_cacheable(response):
+    """Текстовый ответ или небольшой двоичный.
+
+    requests_cache вызывает проверку и для потоковых загрузок, где
+    чтение тела загрузило бы весь архив в память. Поэтому размер
+    берётся из Content-Length, а тело учитывается, только если оно уже
+    прочитано (обычный, не потоковый запрос). Иначе двоичный ответ
+    неизвестного размера в кеш не попадает.
+    """
+    content_type = response.headers.get('Content-Type', '')
+    if content_type.startswith(CACHEABLE_TYPES):
+        return True
+    length = response.headers.get('Content-Length', '')
+    if length.isdigit():
+        return int(length) <= CACHE_BINARY_LIMIT
+    if response._content is False:
+        return False
+    return len(response._content or b'') <= CACHE_BINARY_LIMIT
+
+
+def create_cached_session(cli_args=None):
+    """CachedSession с выбранным бэкендом и сроками хранения ответов.
+
+    Записи файловых бэкендов сжимаются, большие двоичные ответы в кеш
+    не попадают. С --cache-max-size обращения к ответам записываются
+    в журнал session.access_log, по которому `trim_cache` вытесняет
+    давно не использованные; без ограничения журнал не ведётся.
+    """
+    import requests_cache
+
+    from compression import compressed_serializer, resolve_compression
+
+    backend = getattr(cli_args, 'cache_backend', SQLITE_CACHE)
+    settings = {}
+    if backend != MEMORY_CACHE:
+        settings['serializer'] = compressed_serializer(
+            resolve_compression(getattr(
+                cli_args, 'cache_compression', GZIP_COMPRESSION
+            )),
+            getattr(
+                cli_args,
+                'compression_threshold',
+                DEFAULT_COMPRESSION_THRESHOLD
+            ),
+        )
+    session = requests_cache.CachedSession(
+        HTTP_CACHE_NAME,
+        backend=backend,
+        expire_after=NEVER_EXPIRE,
+        urls_expire_after=cache_ttls(cli_args),
+        filter_fn=is_cacheable,
+        **settings,
+    )
+    session.access_log = None
+    if not getattr(cli_args, 'cache_max_size', None):
+        return session
+    session.access_log = CacheAccessLog(
+        ':memory:' if backend == MEMORY_CACHE else CACHE_ACCESS_FILE
+    )
+
+    def track_access(response, *args, **kwargs):
+        session.access_log.touch(session.cache.create_key(response.request))
+
+    session.hooks['response'].append(track_access)
+    return session
+
+
+def cached_responses(session):
+    """Пары (ключ, ответ) из кеша requests_cache."""
+    for key in list(session.cache.responses.keys()):
+        response = session.cache.get_response(key)
+        if response is not None:
+            yield key, response
+
+
+def trim_cache(session, max_size):
+    """Ограничивает размер кеша HTTP-ответов до max_size байт.
+
+    Сначала удаляются устаревшие ответы, затем давно не
+    использованные. Возвращает число вытесненных ответов. Кеш
+    асинхронного движка ограничивается сам (ResponseCache.trim).
+    """
+    if hasattr(session.cache, 'trim'):
+        return session.cache.trim(max_size)
+    session.cache.delete(expired=True)
+    sizes = {
+        key: len(response.content)
+        for key, response in cached_responses(session)
+    }
+    access_log = session.access_log
+    accessed = {} if access_log is None else access_log.accessed()
+    total = sum(sizes.values())
+    evicted = []
+    for key in sorted(sizes, key=lambda key: accessed.get(key, 0)):
+        if total <= max_size:
+            break
+        total -= sizes[key]
+        evicted.append(key)
+    if evicted:
+        session.cache.delete(*evicted)
+    if access_log is not None:
+        access_log.keep(set(sizes) - set(evicted))
+    return len(evicted)
+
+
+def cache_summary(session):
+    """Пары (показатель, значение) о содержимом кеша сессии.
+
+    Вид кеша определяется по session.cache, поэтому сессию можно
+    передавать и в обёртке Frontier. Кеш асинхронного движка сам
+    считает свой размер (ResponseCache.summary).
+    """
+    if hasattr(session.cache, 'summary'):
+        count, expired, size = session.cache.summary()
+    else:
+        responses = [response for _, response in cached_responses(session)]
+        count = len(responses)
+        size = sum(len(response.content) for response in responses)
+        expired = sum(response.is_expired for response in responses)
+    return (
+        ('Ответов', count),
+        ('Устаревших', expired),
+        ('Размер, МБ', round(size / 2**20, 2)),
+    )
+
+
+def create_session(cli_args=None):
+    """Создаёт сессию для выбранного движка загрузки.
+
+    Пул соединений, keep-alive, повторы, таймауты и ограничения
+    обращений к хостам берутся из аргументов командной строки.
+    """
+    host_connections = getattr(
+        cli_args, 'host_connections', DEFAULT_HOST_CONNECTIONS
+    )
+    scheduler = HostScheduler(
+        rate=getattr(cli_args, 'rate_limit', None),
+        concurrency=host_connections,
+        backoff=getattr(cli_args, 'backoff', DEFAULT_BACKOFF),
+    )
+    pool_size = getattr(cli_args, 'pool_size', DEFAULT_POOL_SIZE)
+    keep_alive = getattr(cli_args, 'keep_alive', True)
+    retries = getattr(cli_args, 'retries', DEFAULT_RETRIES)
+    timeout = getattr(cli_args, 'timeout', DEFAULT_TIMEOUT)
+    if getattr(cli_args, 'engine', SYNC_ENGINE) == ASYNC_ENGINE:
+        return AsyncSession(
+            expire_after=cache_ttls(cli_args),
+            host_connections=host_connections,
+            pool_size=pool_size,
+            keep_alive=keep_alive,
+            retries=retries,
+            timeout=timeout,
+            scheduler=scheduler,
+        )
+    session = create_cached_session(cli_args)
+    adapter = TunedHTTPAdapter(
+        timeout=timeout,
+        keep_alive=keep_alive,
+        scheduler=scheduler,
+        throttle_retries=retries,
+        pool_maxsize=pool_size,
+        max_retries=JitterRetry(
+            total=retries,
+            backoff_factor=getattr(cli_args, 'backoff', DEFAULT_BACKOFF),
+            status_forcelist=RETRY_STATUSES,
+            respect_retry_after_header=False,
+            jitter=getattr(cli_args, 'jitter', DEFAULT_JITTER),
+        ),
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+    return session
@@ -0,0 +1,263 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import weakref
+from collections import namedtuple
+
+PageState = namedtuple('PageState', 'etag last_modified data')
+
+
+class PageStateStore:
+    """Валидаторы (ETag, Last-Modified) и извлечённые данные страниц.
+
+    Ключ записи выбирает вызывающий код, обычно это адрес страницы
+    вместе с версией функции извлечения.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            str(path), check_same_thread=False
+        )
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS pages ('
+            'key TEXT PRIMARY KEY, etag TEXT, '
+            'last_modified TEXT, data TEXT)'
+        )
+
+    def get(self, key):
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT etag, last_modified, data FROM pages WHERE key = ?',
+                (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, data = row
+        return PageState(etag, last_modified, json.loads(data))
+
+    def save(self, key, etag, last_modified, data):
+        with self._lock, self._connection:
+            self._connection.execute(
+                'REPLACE INTO pages VALUES (?, ?, ?, ?)',
+                (key, etag, last_modified, json.dumps(data))
+            )
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM pages')
+
+
+class ParsedCache:
+    """Данные, извлечённые из страниц.
+
+    Ключ учитывает хеш тела ответа и версию функции извлечения,
+    поэтому изменение страницы или функции делает запись неактуальной,
+    а одинаковые страницы по разным адресам разбираются один раз.
+    Когда суммарный размер записей превышает max_size байт, удаляются
+    давно не использованные. Время обращений копится в памяти и
+    записывается перед сохранением новой записи, при вызове flush
+    и при удалении объекта, а не при каждом чтении.
+    """
+
+    def __init__(self, path, max_size):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._accessed = {}
+        self._connection = sqlite3.connect(
+            str(path), check_same_thread=False
+        )
+        self._finalizer = weakref.finalize(
+            self, self._write_accessed, self._connection, self._accessed
+        )
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS parsed ('
+            'key TEXT PRIMARY KEY, url TEXT, data TEXT, '
+            'size INTEGER, accessed REAL)'
+        )
+        self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS parsed_accessed '
+            'ON parsed (accessed)'
+        )
+
+    @staticmethod
+    def make_key(content, extractor):
+        digest = hashlib.sha256(content).hexdigest()
+        return f'{extractor}|{digest}'
+
+    @staticmethod
+    def _write_accessed(connection, accessed):
+        if accessed:
+            with connection:
+                connection.executemany(
+                    'UPDATE parsed SET accessed = ? WHERE key = ?',
+                    ((when, key) for key, when in accessed.items())
+                )
+            accessed.clear()
+
+    def get(self, key):
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT data FROM parsed WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._accessed[key] = time.time()
+        return json.loads(row[0])
+
+    def flush(self):
+        """Записывает накопленное время обращений в базу."""
+        with self._lock:
+            self._write_accessed(self._connection, self._accessed)
+
+    def save(self, key, url, data):
+        dumped = json.dumps(data)
+        with self._lock:
+            self._write_accessed(self._connection, self._accessed)
+            with self._connection:
+                self._connection.execute(
+                    'REPLACE INTO parsed VALUES (?, ?, ?, ?, ?)',
+                    (key, url, dumped, len(dumped), time.time())
+                )
+                self._evict()
+
+    def _evict(self):
+        total, = self._connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM parsed'
+        ).fetchone()
+        rows = self._connection.execute(
+            'SELECT key, size FROM parsed ORDER BY accessed'
+        )
+        stale = []
+        for key, size in rows:
+            if total <= self.max_size:
+                break
+            stale.append((key,))
+            total -= size
+        self._connection.executemany(
+            'DELETE FROM parsed WHERE key = ?', stale
+        )
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._accessed.clear()
+            self._connection.execute('DELETE FROM parsed')
+
+
+class CacheAccessLog:
+    """Время последнего обращения к ответам HTTP-кеша.
+
+    requests_cache хранит только время сохранения ответа, а для
+    вытеснения давно не использованных записей нужно время чтения.
+    Обращения копятся в памяти и записываются в базу одной транзакцией,
+    когда журнал читают или чистят.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._connection = sqlite3.connect(
+            str(path), check_same_thread=False
+        )
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS access ('
+            'key TEXT PRIMARY KEY, accessed REAL)'
+        )
+
+    def touch(self, key):
+        with self._lock:
+            self._pending[key] = time.time()
+
+    def _flush(self):
+        if self._pending:
+            with self._connection:
+                self._connection.executemany(
+                    'REPLACE INTO access VALUES (?, ?)',
+                    self._pending.items()
+                )
+            self._pending.clear()
+
+    def accessed(self):
+        """Словарь: ключ ответа -> время последнего обращения."""
+        with self._lock:
+            self._flush()
+            return dict(self._connection.execute(
+                'SELECT key, accessed FROM access'
+            ))
+
+    def keep(self, keys):
+        """Удаляет записи о ключах, которых нет в keys."""
+        with self._lock:
+            self._flush()
+            with self._connection:
+                self._connection.execute(
+                    'CREATE TEMP TABLE kept (key TEXT)'
+                )
+                self._connection.executemany(
+                    'INSERT INTO kept VALUES (?)', ((key,) for key in keys)
+                )
+                self._connection.execute(
+                    'DELETE FROM access '
+                    'WHERE key NOT IN (SELECT key FROM kept)'
+                )
+                self._connection.execute('DROP TABLE kept')
+
+
+class Checkpoint:
+    """Журнал обработанных PEP для продолжения прерванного обхода.
+
+    Каждая запись — строка JSON, которая дописывается и сбрасывается
+    на диск сразу после обработки PEP, поэтому при падении теряется
+    не больше одной записи. Без resume журнал начинается заново,
+    без path записи хранятся только в памяти.
+    """
+
+    def __init__(self, path=None, resume=False):
+        self.path = path
+        self.done = {}
+        self._file = None
+        if path is None:
+            return
+        if resume and path.exists():
+            self._load()
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def _load(self):
+        with open(self.path, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Последняя строка могла не дописаться при падении.
+                    break
+                self.done[record['link']] = record
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, number, link, status, metadata=None):
+        record = {'number': number, 'link': link, 'status': status}
+        if metadata is not None:
+            record['metadata'] = metadata
+        self.done[link] = record
+        if self._file is not None:
+            self._file.write(
+                json.dumps(record, ensure_ascii=False) + '\n'
+            )
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def finish(self):
+        """Удаляет журнал после успешного завершения обхода."""
+        self.close()
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
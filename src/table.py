@@ -0,0 +1,166 @@
+import sys
+from array import array
+from collections import Counter
+from datetime import date, datetime
+
+DATE_FORMATS = ('%d-%b-%Y', '%Y-%m-%d')
+NO_DATE = 0
+
+
+class IntColumn:
+    """Целые числа в массиве array с заданным типом элементов."""
+
+    def __init__(self, typecode='I'):
+        self.values = array(typecode)
+
+    def append(self, value):
+        self.values.append(int(value))
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def __len__(self):
+        return len(self.values)
+
+    def nbytes(self):
+        return sys.getsizeof(self.values)
+
+
+class TextColumn:
+    """Строки в одном буфере UTF-8 и массив смещений их концов.
+
+    На строку уходит 4 байта смещения и её байты, без отдельного
+    объекта str на каждое значение.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array('I', [0])
+
+    def append(self, value):
+        self.data += (value or '').encode('utf-8')
+        self.offsets.append(len(self.data))
+
+    def __getitem__(self, index):
+        return self.data[
+            self.offsets[index]:self.offsets[index + 1]
+        ].decode('utf-8')
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def nbytes(self):
+        return sys.getsizeof(self.data) + sys.getsizeof(self.offsets)
+
+
+class CategoryColumn:
+    """Значения из небольшого набора: коды в массиве и словарь значений.
+
+    Подходит для статуса, типа, версии Python: на строку уходит
+    2 байта кода.
+    """
+
+    def __init__(self):
+        self.codes = array('H')
+        self.categories = []
+        self._index = {}
+
+    def append(self, value):
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.categories)
+            self.categories.append(value)
+        self.codes.append(code)
+
+    def __getitem__(self, index):
+        return self.categories[self.codes[index]]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def counts(self):
+        """Число строк с каждым значением, без перебора самих значений."""
+        return {
+            self.categories[code]: count
+            for code, count in Counter(self.codes).most_common()
+        }
+
+    def nbytes(self):
+        return sys.getsizeof(self.codes) + sum(
+            sys.getsizeof(value) for value in self.categories
+        )
+
+
+def parse_date(value):
+    """Дата из карточки PEP (13-Jun-2000 или 2000-06-13) или None."""
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), date_format).date()
+        except (AttributeError, ValueError):
+            continue
+    return None
+
+
+class DateColumn:
+    """Даты как порядковые номера дней в массиве; 0 — даты нет."""
+
+    def __init__(self):
+        self.ordinals = array('I')
+
+    def append(self, value):
+        if isinstance(value, str):
+            value = parse_date(value)
+        self.ordinals.append(NO_DATE if value is None else value.toordinal())
+
+    def __getitem__(self, index):
+        ordinal = self.ordinals[index]
+        return None if ordinal == NO_DATE else date.fromordinal(ordinal)
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def nbytes(self):
+        return sys.getsizeof(self.ordinals)
+
+
+class ColumnTable:
+    """Таблица, которая хранит каждый столбец отдельно и компактно.
+
+    columns — пары (имя, столбец). Строки добавляются кортежами
+    значений в порядке столбцов; rows() собирает их обратно.
+    """
+
+    def __init__(self, columns):
+        self.columns = dict(columns)
+
+    @property
+    def header(self):
+        return tuple(self.columns)
+
+    def append(self, row):
+        for column, value in zip(self.columns.values(), row):
+            column.append(value)
+
+    def __len__(self):
+        return len(next(iter(self.columns.values())))
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def rows(self):
+        columns = tuple(self.columns.values())
+        for index in range(len(self)):
+            yield tuple(column[index] for column in columns)
+
+    def count_by(self, name):
+        """Число строк с каждым значением столбца name."""
+        column = self.columns[name]
+        if isinstance(column, CategoryColumn):
+            return column.counts()
+        return dict(Counter(
+            column[index] for index in range(len(column))
+        ).most_common())
+
+    def nbytes(self):
+        """Память, занятая столбцами, байт."""
+        return sum(column.nbytes() for column in self.columns.values())
@@ -0,0 +1,172 @@
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from constants import (
+    DEFAULT_BACKOFF, DEFAULT_HOST_CONNECTIONS, MAX_RETRY_DELAY,
+    THROTTLE_STATUSES
+)
+
+
+class TokenBucket:
+    """Ограничение скорости, общее для всех потоков.
+
+    Корзина пополняется на rate единиц в секунду и вмещает не больше
+    capacity. Если единиц не хватает, `consume` берёт их в долг и ждёт,
+    пока долг не покроется, поэтому средняя скорость не превышает rate.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def reserve(self, amount=1):
+        """Забирает amount единиц и возвращает, сколько секунд ждать."""
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            return -self._tokens / self.rate if self._tokens < 0 else 0
+
+    def consume(self, amount=1):
+        """Забирает amount единиц, при необходимости ожидая."""
+        wait = self.reserve(amount)
+        if wait:
+            time.sleep(wait)
+
+
+def retry_after_delay(value):
+    """Задержка в секундах из заголовка Retry-After.
+
+    Заголовок содержит либо число секунд, либо дату HTTP. Если его нет
+    или он не разбирается, возвращается None.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+class HostState:
+    """Ограничения и состояние обращений к одному хосту."""
+
+    def __init__(self, rate, concurrency):
+        self.bucket = TokenBucket(rate, capacity=1) if rate else None
+        self.max_concurrency = concurrency
+        self.limit = concurrency
+        self.active = 0
+        self.paused_until = 0.0
+        self.throttled = 0
+
+
+class HostScheduler:
+    """Вежливый обход: скорость и число запросов к каждому хосту.
+
+    Для каждого хоста не больше rate запросов в секунду (без
+    ограничения, если rate не задан) и не больше concurrency запросов
+    одновременно. Ответы 429 и 503 приостанавливают хост на время из
+    Retry-After или на экспоненциально растущую задержку и вдвое
+    снижают допустимое число одновременных запросов; каждый успешный
+    ответ возвращает по одному запросу до concurrency.
+    """
+
+    def __init__(
+        self,
+        rate=None,
+        concurrency=DEFAULT_HOST_CONNECTIONS,
+        backoff=DEFAULT_BACKOFF,
+        max_delay=MAX_RETRY_DELAY,
+    ):
+        self.rate = rate
+        self.concurrency = concurrency
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self._hosts = {}
+        self._condition = threading.Condition()
+
+    def _host(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = HostState(self.rate, self.concurrency)
+        return self._hosts[host]
+
+    def reserve(self, url):
+        """Сколько секунд подождать перед запросом к хосту url."""
+        with self._condition:
+            host = self._host(url)
+        delay = max(host.paused_until - time.monotonic(), 0)
+        if host.bucket is not None:
+            delay = max(delay, host.bucket.reserve())
+        return delay
+
+    @contextmanager
+    def slot(self, url):
+        """Блок with, внутри которого можно отправить запрос к хосту."""
+        with self._condition:
+            host = self._host(url)
+            while host.active >= host.limit:
+                self._condition.wait()
+            host.active += 1
+        try:
+            delay = self.reserve(url)
+            if delay:
+                time.sleep(delay)
+            yield
+        finally:
+            with self._condition:
+                host.active -= 1
+                self._condition.notify_all()
+
+    def feedback(self, url, status_code, retry_after=None):
+        """Учитывает ответ хоста; True, если хост просит подождать."""
+        with self._condition:
+            host = self._host(url)
+            if status_code not in THROTTLE_STATUSES:
+                host.throttled = 0
+                if host.limit < host.max_concurrency:
+                    host.limit += 1
+                    self._condition.notify_all()
+                return False
+            host.throttled += 1
+            host.limit = max(host.limit // 2, 1)
+            delay = retry_after_delay(retry_after)
+            if delay is None:
+                delay = self.backoff * 2 ** (host.throttled - 1)
+            host.paused_until = max(
+                host.paused_until,
+                time.monotonic() + min(delay, self.max_delay)
+            )
+            return True
+
+    def send(self, url, send, retries=0):
+        """Вызывает send() с учётом ограничений хоста.
+
+        Ответы 429 и 503 повторяются не больше retries раз, последний
+        ответ возвращается как есть.
+        """
+        for attempt in range(retries + 1):
+            with self.slot(url):
+                response = send()
+            throttled = self.feedback(
+                url, response.status_code, response.headers.get('Retry-After')
+            )
+            if not throttled or attempt == retries:
+                return response
+            response.close()
@@ -1,28 +1,212 @@
-from bs4 import BeautifulSoup
-from requests import RequestException
+import hashlib
+import logging
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from functools import lru_cache, partial
 
-from exceptions import ParserFindTagException
+from constants import (
+    DEFAULT_PARSER, DEFAULT_WORKERS, DOWNLOAD_CHUNK_SIZE, EXTRACTOR_VERSION,
+    PARTIAL_SUFFIX
+)
+from exceptions import DownloadException, ParserFindTagException
 
 MESSAGE_BROKEN_URL = 'Адрес {link} не вернул ожидаемый ответ'
 ERROR_MESSAGE = 'Не найден тег {tag} {attrs}'
+NOT_MODIFIED = 304
+PARTIAL_CONTENT = 206
+RANGE_NOT_SATISFIABLE = 416
+SIZE_MISMATCH = 'Размер файла {path}: {size} байт, ожидалось {expected}'
+HASH_MISMATCH = 'SHA-256 файла {path}: {digest}, ожидалось {expected}'
+PARSER_NOT_FOUND = 'Парсер {features} не установлен, используется {default}'
 
+ParseOptions = namedtuple(
+    'ParseOptions',
+    'state cache features profile pool',
+    defaults=(None, None, DEFAULT_PARSER, None, None)
+)
 
-def get_soup(session, url, features='html.parser'):
+
+def get_soup(session, url, features=DEFAULT_PARSER):
     """Возвращает объект soup."""
+    from bs4 import BeautifulSoup
+
     return BeautifulSoup(get_response(session, url).text, features)
 
 
-def get_response(session, url, encoding="utf-8"):
+def get_response(session, url, encoding="utf-8", headers=None):
     """Делает запрос, возвращает ответ
        или перехватывает ошибку."""
+    from requests import RequestException
+
     try:
-        response = session.get(url)
+        response = session.get(url, headers=headers)
         response.encoding = encoding
         return response
     except RequestException:
         raise ConnectionError(MESSAGE_BROKEN_URL.format(link=url))
 
 
+def parses(*args, **kwargs):
+    """Ограничивает разбор страницы для функции извлечения.
+
+    В дерево попадают только теги, подходящие под
+    SoupStrainer(*args, **kwargs), и их потомки. Сам SoupStrainer
+    создаётся при первом разборе, чтобы не импортировать bs4 при
+    загрузке модулей.
+    """
+    def decorator(extract):
+        extract.strainer_args = (args, kwargs)
+        return extract
+    return decorator
+
+
+@lru_cache(maxsize=None)
+def parse_only(extract):
+    """SoupStrainer, заданный для extract декоратором parses."""
+    from bs4 import SoupStrainer
+
+    if not hasattr(extract, 'strainer_args'):
+        return None
+    args, kwargs = extract.strainer_args
+    return SoupStrainer(*args, **kwargs)
+
+
+def resolve_parser(features):
+    """Возвращает features, если такой парсер установлен.
+
+    Иначе пишет предупреждение и возвращает парсер по умолчанию.
+    """
+    from bs4.builder import builder_registry
+
+    if builder_registry.lookup(features) is None:
+        logging.warning(PARSER_NOT_FOUND.format(
+            features=features, default=DEFAULT_PARSER
+        ))
+        return DEFAULT_PARSER
+    return features
+
+
+def make_soup(text, extract, features=DEFAULT_PARSER):
+    """Разбирает ровно ту часть страницы, которая нужна extract."""
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(text, features, parse_only=parse_only(extract))
+
+
+def parse_markup(content, encoding, extract, features=DEFAULT_PARSER):
+    """Разбирает тело страницы в байтах и применяет к нему extract.
+
+    Выполняется в процессах пула разбора: туда передаются байты
+    страницы, а обратно — только извлечённые данные, без дерева soup.
+    """
+    from bs4 import BeautifulSoup
+
+    return extract(BeautifulSoup(
+        content,
+        features,
+        from_encoding=encoding,
+        parse_only=parse_only(extract)
+    ))
+
+
+def extractor_id(extract, features=DEFAULT_PARSER):
+    """Имя и версия функции извлечения вместе с парсером HTML."""
+    return (
+        f'{extract.__module__}.{extract.__name__}:{EXTRACTOR_VERSION}:'
+        f'{features}'
+    )
+
+
+def fetch_page(session, url, options, headers=None):
+    """get_response с замером времени в options.profile."""
+    if options.profile is None:
+        return get_response(session, url, headers=headers)
+    start = time.perf_counter()
+    response = get_response(session, url, headers=headers)
+    options.profile.record_fetch(url, time.perf_counter() - start, response)
+    return response
+
+
+def run_extract(response, extract, options):
+    """Разбирает страницу в этом потоке или в пуле процессов options.pool."""
+    if options.pool is None:
+        return extract(make_soup(response.text, extract, options.features))
+    return options.pool.submit(
+        parse_markup,
+        response.content,
+        response.encoding,
+        extract,
+        options.features
+    ).result()
+
+
+def parse_response(response, extract, options):
+    """Разбирает страницу и применяет к ней extract."""
+    if options.profile is None:
+        return run_extract(response, extract, options)
+    with options.profile.parsing(response.url, extract.__name__):
+        return run_extract(response, extract, options)
+
+
+def extract_data(response, extract, options):
+    """Применяет extract к странице из ответа.
+
+    Если в кеше options.cache есть данные для того же тела страницы
+    и той же версии extract, HTML не разбирается, даже когда страница
+    загружена по другому адресу.
+    """
+    if options.cache is None:
+        return parse_response(response, extract, options)
+    key = options.cache.make_key(
+        response.content, extractor_id(extract, options.features)
+    )
+    data = options.cache.get(key)
+    if data is None:
+        data = parse_response(response, extract, options)
+        options.cache.save(key, response.url, data)
+    return data
+
+
+def get_conditional(session, url, extract, options):
+    """Условный запрос страницы в обход HTTP-кеша.
+
+    Если страница не изменилась (304), разбор пропускается
+    и возвращаются данные, сохранённые в прошлый раз той же
+    версией extract.
+    """
+    key = f'{extractor_id(extract, options.features)}|{url}'
+    saved = options.state.get(key)
+    headers = {'Cache-Control': 'no-store'}
+    if saved is not None and saved.etag:
+        headers['If-None-Match'] = saved.etag
+    if saved is not None and saved.last_modified:
+        headers['If-Modified-Since'] = saved.last_modified
+    response = fetch_page(session, url, options, headers)
+    if saved is not None and response.status_code == NOT_MODIFIED:
+        return saved.data
+    data = extract_data(response, extract, options)
+    options.state.save(
+        key,
+        response.headers.get('ETag'),
+        response.headers.get('Last-Modified'),
+        data
+    )
+    return data
+
+
+def get_page_data(session, url, extract, options=ParseOptions()):
+    """Загружает страницу и извлекает из неё данные функцией extract.
+
+    С хранилищем options.state страница запрашивается условно.
+    """
+    if options.state is not None:
+        return get_conditional(session, url, extract, options)
+    return extract_data(fetch_page(session, url, options), extract, options)
+
+
 def find_tag(soup, tag, attrs=None):
     """Поиск тэга и перехват ошибки."""
     search_attributes = attrs if attrs is not None else {}
@@ -35,3 +219,164 @@ def find_tag(soup, tag, attrs=None):
                 )
             )
     return searched_tag
+
+
+def prefetch(session, urls):
+    """Заранее загружает страницы, если сессия это поддерживает."""
+    if hasattr(session, 'prefetch'):
+        session.prefetch(urls)
+
+
+def fetch_workers(cli_args=None):
+    """Число потоков загрузки страниц.
+
+    Поток ждёт, пока пул процессов разберёт его страницу, поэтому
+    потоков не меньше, чем процессов --parse-processes: иначе часть
+    процессов простаивала бы.
+    """
+    return max(
+        getattr(cli_args, 'workers', DEFAULT_WORKERS),
+        getattr(cli_args, 'parse_processes', None) or 1
+    )
+
+
+def map_pages(session, parse_page, links, cli_args=None):
+    """Вызывает parse_page(session, link) для ссылок в пуле потоков.
+
+    Пары (ссылка, результат) отдаются в порядке ссылок. С --incremental
+    страницы не загружаются заранее: условные запросы идут в обход
+    кеша, и каждая страница загружалась бы дважды.
+    """
+    from tqdm import tqdm
+
+    if not getattr(cli_args, 'incremental', False):
+        prefetch(session, links)
+    with ThreadPoolExecutor(max_workers=fetch_workers(cli_args)) as executor:
+        yield from tqdm(
+            zip(links, executor.map(partial(parse_page, session), links)),
+            total=len(links)
+        )
+
+
+def file_digest(path, digest, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """Добавляет содержимое файла в хеш по частям."""
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest
+
+
+def is_up_to_date(session, url, path):
+    """Совпадает ли файл с удалённым по размеру и Last-Modified."""
+    if not path.exists():
+        return False
+    from requests import RequestException
+
+    try:
+        response = session.head(
+            url, headers={'Cache-Control': 'no-store'}, allow_redirects=True
+        )
+    except RequestException:
+        return False
+    length = response.headers.get('Content-Length')
+    last_modified = response.headers.get('Last-Modified')
+    if not response.ok or length is None or last_modified is None:
+        return False
+    stat = path.stat()
+    return (
+        stat.st_size == int(length)
+        and stat.st_mtime >= parsedate_to_datetime(last_modified).timestamp()
+    )
+
+
+def write_chunks(
+    response, part_path, offset, expected_size, digest, chunk_size, limiter
+):
+    """Дописывает тело ответа в файл частями, обновляя хеш."""
+    from tqdm import tqdm
+
+    with open(part_path, 'ab' if offset else 'wb') as file, tqdm(
+        total=expected_size,
+        initial=offset,
+        unit='B',
+        unit_scale=True,
+        desc=part_path.name
+    ) as progress:
+        for chunk in response.iter_content(chunk_size):
+            if limiter is not None:
+                limiter.consume(len(chunk))
+            file.write(chunk)
+            digest.update(chunk)
+            progress.update(len(chunk))
+
+
+def check_download(part_path, expected_size, digest, expected_sha256):
+    """Сверяет размер и SHA-256 загруженного файла."""
+    size = part_path.stat().st_size
+    if expected_size is not None and size != expected_size:
+        raise DownloadException(SIZE_MISMATCH.format(
+            path=part_path, size=size, expected=expected_size
+        ))
+    if expected_sha256 and digest.hexdigest() != expected_sha256.lower():
+        part_path.unlink()
+        raise DownloadException(HASH_MISMATCH.format(
+            path=part_path,
+            digest=digest.hexdigest(),
+            expected=expected_sha256
+        ))
+
+
+def stream_download(
+    session,
+    url,
+    path,
+    expected_sha256=None,
+    chunk_size=DOWNLOAD_CHUNK_SIZE,
+    limiter=None,
+):
+    """Потоковая загрузка файла в обход кеша ответов.
+
+    Файл пишется частями во временный `<имя>.part`; если он остался от
+    прерванной загрузки, запрашивается только недостающий диапазон.
+    Размер сверяется с заголовками ответа, а SHA-256 — с expected_sha256.
+    Скорость ограничивается общим для потоков limiter (байт в секунду).
+    Время изменения файла берётся из Last-Modified.
+    Возвращает SHA-256 загруженного файла.
+    """
+    part_path = path.with_name(path.name + PARTIAL_SUFFIX)
+    offset = part_path.stat().st_size if part_path.exists() else 0
+    headers = {'Cache-Control': 'no-store'}
+    if offset:
+        headers['Range'] = f'bytes={offset}-'
+    from requests import RequestException
+
+    try:
+        response = session.get(url, headers=headers, stream=True)
+    except RequestException:
+        raise ConnectionError(MESSAGE_BROKEN_URL.format(link=url))
+    with response:
+        if response.status_code == RANGE_NOT_SATISFIABLE:
+            part_path.unlink()
+            return stream_download(
+                session, url, path, expected_sha256, chunk_size, limiter
+            )
+        if not response.ok:
+            raise ConnectionError(MESSAGE_BROKEN_URL.format(link=url))
+        digest = hashlib.sha256()
+        if response.status_code == PARTIAL_CONTENT:
+            file_digest(part_path, digest)
+        else:
+            offset = 0
+        length = response.headers.get('Content-Length')
+        last_modified = response.headers.get('Last-Modified')
+        expected_size = offset + int(length) if length else None
+        write_chunks(
+            response, part_path, offset, expected_size, digest,
+            chunk_size, limiter
+        )
+    check_download(part_path, expected_size, digest, expected_sha256)
+    part_path.replace(path)
+    if last_modified:
+        modified = parsedate_to_datetime(last_modified).timestamp()
+        os.utime(path, (modified, modified))
+    return digest.hexdigest()
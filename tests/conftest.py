@@ -1,7 +1,10 @@
+import hashlib
+import re
 import sys
+import time
 from argparse import Namespace
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 import pytest
 import requests_mock
@@ -16,6 +19,11 @@ sys.path.append(str(SRC_DIR))
 
 MAIN_DOC_URL = 'https://docs.python.org/3/'
 PEP_URL = 'https://www.python.org/dev/peps/'
+PEP_INDEX_URL = 'https://peps.python.org/'
+WHATS_NEW_VERSIONS = ('3.12', '3.11', '3.10')
+DOC_VERSIONS = ('3.13', '3.12', '3.11')
+ARCHIVE_CONTENT = b'PK' + b'\x00' * 4096
+ARCHIVE_LAST_MODIFIED = 'Tue, 05 Mar 2024 10:00:00 GMT'
 
 
 precode_files = ['constants.py', 'main.py', 'utils.py']
@@ -72,6 +80,143 @@ def mock_session(tempfile_session) -> CachedSession:
     yield mount_mock_adapter(tempfile_session)
 
 
+def delayed(body, delay):
+    """Ответ адаптера с ETag, имитирующий сетевую задержку.
+
+    На условный запрос с тем же ETag отвечает 304.
+    """
+    etag = '"{}"'.format(hashlib.md5(body.encode()).hexdigest())
+
+    def _callback(request, context):
+        time.sleep(delay)
+        context.headers['ETag'] = etag
+        if request.headers.get('If-None-Match') == etag:
+            context.status_code = 304
+            return ''
+        return body
+    return _callback
+
+
+def get_site_pages(pep_count: int) -> Dict[str, str]:
+    """Адреса и содержимое упрощённых копий страниц сайтов."""
+    from tests.fixture_data import pages
+
+    site_pages = {
+        MAIN_DOC_URL: pages.MAIN_DOC_PAGE,
+        MAIN_DOC_URL + 'download.html': pages.download_page(),
+        PEP_INDEX_URL: pages.pep_index(pep_count),
+    }
+    for doc_url, articles in (
+        (MAIN_DOC_URL, WHATS_NEW_VERSIONS),
+        *(
+            (
+                f'https://docs.python.org/{version}/',
+                (*WHATS_NEW_VERSIONS, 'changelog')
+            )
+            for version in DOC_VERSIONS
+        ),
+    ):
+        site_pages[doc_url + 'whatsnew/'] = pages.whats_new_index(articles)
+        for article in articles:
+            site_pages[f'{doc_url}whatsnew/{article}.html'] = (
+                pages.whats_new_page(article)
+            )
+    for version in DOC_VERSIONS:
+        site_pages[f'https://docs.python.org/{version}/download.html'] = (
+            pages.download_page(version)
+        )
+    for number in range(1, pep_count + 1):
+        site_pages[f'{PEP_INDEX_URL}pep-{number:04d}/'] = (
+            pages.pep_page(number)
+        )
+    return site_pages
+
+
+def get_site_adapter(pep_count: int, delay: float = 0) -> Adapter:
+    """Адаптер, отдающий упрощённые копии страниц сайтов."""
+    adapter = Adapter()
+    for method in ('GET', 'HEAD'):
+        adapter.register_uri(
+            method,
+            re.compile(r'.*\.(zip|epub|bz2)$'),
+            content=ARCHIVE_CONTENT,
+            headers={
+                'Content-Type': 'application/zip',
+                'Content-Length': str(len(ARCHIVE_CONTENT)),
+                'Last-Modified': ARCHIVE_LAST_MODIFIED,
+            },
+        )
+    for url, body in get_site_pages(pep_count).items():
+        adapter.register_uri('GET', url, text=delayed(body, delay))
+    return adapter
+
+
+@pytest.fixture
+def site_session():
+    """Фабрика сессий, обслуживаемых копиями страниц сайтов."""
+    def _site_session(pep_count: int = 20, delay: float = 0):
+        session = CachedSession(backend='memory')
+        adapter = get_site_adapter(pep_count, delay)
+        session.mount('https://', adapter)
+        session.mock_adapter = adapter
+        return session
+    return _site_session
+
+
+def archive_response(request):
+    """Ответ httpx с архивом; заголовок Range даёт часть архива."""
+    import httpx
+
+    headers = {
+        'Content-Type': 'application/zip',
+        'Last-Modified': ARCHIVE_LAST_MODIFIED,
+    }
+    status, content = 200, ARCHIVE_CONTENT
+    match = re.fullmatch(r'bytes=(\d+)-', request.headers.get('Range', ''))
+    if match is not None:
+        status, content = 206, ARCHIVE_CONTENT[int(match[1]):]
+    headers['Content-Length'] = str(len(content))
+    if request.method == 'HEAD':
+        content = b''
+    return httpx.Response(status, content=content, headers=headers)
+
+
+@pytest.fixture
+def async_site_session(tmp_path):
+    """Фабрика асинхронных сессий поверх копий страниц сайтов."""
+    httpx = pytest.importorskip('httpx')
+    from src.sessions import AsyncSession
+
+    sessions = []
+
+    def _async_site_session(pep_count: int = 20):
+        site_pages = get_site_pages(pep_count)
+
+        def handler(request):
+            history.append(request)
+            if re.search(r'\.(zip|epub|bz2)$', request.url.path):
+                return archive_response(request)
+            body = site_pages.get(str(request.url))
+            if body is None:
+                return httpx.Response(404)
+            return httpx.Response(
+                200, text=body, headers={'Content-Type': 'text/html'}
+            )
+
+        history = []
+        session = AsyncSession(
+            cache_path=tmp_path / f'cache_{len(sessions)}.sqlite',
+            transport=httpx.MockTransport(handler),
+        )
+        session.request_history = history
+        sessions.append(session)
+        return session
+
+    yield _async_site_session
+    for session in sessions:
+        session.close()
+
+
 @pytest.fixture
 def response_page(mock_session):
     def _response_page(page):
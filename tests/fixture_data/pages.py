@@ -0,0 +1,191 @@
+"""Упрощённые копии страниц docs.python.org и peps.python.org."""
+
+PEP_STATUSES = (
+    ('PA', 'Active'),
+    ('SF', 'Final'),
+    ('SR', 'Rejected'),
+    ('IW', 'Withdrawn'),
+    ('SD', 'Deferred'),
+    ('SS', 'Superseded'),
+    ('SA', 'Accepted'),
+    ('S', 'Draft'),
+)
+
+PEP_INDEX_ROW = (
+    '<tr class="row-odd">'
+    '<td><abbr title="{abbr}">{abbr}</abbr></td>'
+    '<td><a class="pep reference internal" href="pep-{number:04d}/" '
+    'title="PEP {number}">{number}</a></td>'
+    '<td>Sample PEP {number}</td>'
+    '<td>Guido van Rossum</td>'
+    '</tr>'
+)
+
+PEP_INDEX = (
+    '<!DOCTYPE html><html><head><title>PEP 0</title></head><body>'
+    '<section id="index-by-category"><table class="pep-zero-table">'
+    '<tbody>{rows}</tbody></table></section>'
+    '<section id="numerical-index">'
+    '<table class="pep-zero-table docutils align-default">'
+    '<thead><tr><th>Status</th><th>PEP</th><th>Title</th>'
+    '<th>Authors</th></tr></thead>'
+    '<tbody>{rows}</tbody></table></section>'
+    '</body></html>'
+)
+
+PEP_PAGE = (
+    '<!DOCTYPE html><html><head><title>PEP {number}</title></head><body>'
+    '<section id="pep-content"><h1 class="page-title">PEP {number} - '
+    'Sample PEP {number}</h1>'
+    '<dl class="rfc2822 field-list simple">'
+    '<dt class="field-odd">Author<span class="colon">:</span></dt>'
+    '<dd class="field-odd">Guido van Rossum</dd>'
+    '<dt class="field-even">Status<span class="colon">:</span></dt>'
+    '<dd class="field-even"><abbr title="status">{status}</abbr></dd>'
+    '<dt class="field-odd">Type<span class="colon">:</span></dt>'
+    '<dd class="field-odd"><abbr title="type">Standards Track</abbr></dd>'
+    '<dt class="field-even">Created<span class="colon">:</span></dt>'
+    '<dd class="field-even">13-Jun-2000</dd>'
+    '<dt class="field-odd">Python-Version<span class="colon">:</span></dt>'
+    '<dd class="field-odd">2.1</dd>'
+    '<dt class="field-even">Post-History<span class="colon">:</span></dt>'
+    '<dd class="field-even"><a href="#">16-Jun-2000</a>, \n'
+    '<a href="#">24-Jun-2000</a></dd>'
+    '</dl>'
+    '{sections}'
+    '</section></body></html>'
+)
+
+SECTION = (
+    '<section id="section-{number}"><h2>Section {number}</h2>'
+    '<p>{text}</p><div class="highlight-python notranslate">'
+    '<pre><span class="k">def</span> <span class="nf">f</span>'
+    '<span class="p">():</span> <span class="k">pass</span></pre></div>'
+    '<ul><li><a href="#ref-{number}">Reference {number}</a></li>'
+    '<li><code class="docutils literal">x = {number}</code></li></ul>'
+    '</section>'
+)
+
+WHATS_NEW_INDEX = (
+    '<!DOCTYPE html><html><head><title>What’s New</title></head><body>'
+    '<section id="what-s-new-in-python"><h1>What’s New in Python</h1>'
+    '<div class="toctree-wrapper compound"><ul>{items}</ul></div>'
+    '</section></body></html>'
+)
+
+WHATS_NEW_ITEM = (
+    '<li class="toctree-l1"><a class="reference internal" '
+    'href="{version}.html">What’s New In Python {version}</a></li>'
+)
+
+WHATS_NEW_PAGE = (
+    '<!DOCTYPE html><html><head><title>{version}</title></head><body>'
+    '<section id="what-s-new-in-python-{slug}">'
+    '<h1>What’s New In Python {version}<a class="headerlink" '
+    'href="#">¶</a></h1>'
+    '<dl class="field-list simple">'
+    '<dt class="field-odd">Release<span class="colon">:</span></dt>'
+    '<dd class="field-odd"><p>{version}.0</p>\n</dd>'
+    '<dt class="field-even">Editor<span class="colon">:</span></dt>'
+    '<dd class="field-even"><p>Pablo Galindo Salgado</p>\n</dd>'
+    '</dl>{sections}</section></body></html>'
+)
+
+MAIN_DOC_PAGE = (
+    '<!DOCTYPE html><html><head><title>Python docs</title></head><body>'
+    '<div class="sphinxsidebar"><div class="sphinxsidebarwrapper">'
+    '<h3>Docs by version</h3><ul>'
+    '<li><a href="https://docs.python.org/3.13/">Python 3.13 '
+    '(in development)</a></li>'
+    '<li><a href="https://docs.python.org/3.12/">Python 3.12 '
+    '(stable)</a></li>'
+    '<li><a href="https://docs.python.org/3.11/">Python 3.11 '
+    '(security-fixes)</a></li>'
+    '<li><a href="https://www.python.org/doc/versions/">All versions</a>'
+    '</li></ul>'
+    '<h3>Other resources</h3><ul><li><a href="#">PEP Index</a></li></ul>'
+    '</div></div></body></html>'
+)
+
+DOWNLOAD_PAGE = (
+    '<!DOCTYPE html><html><head><title>Download</title></head><body>'
+    '<section id="download-python-documentation">'
+    '<h1>Download Python documentation</h1>'
+    '<p>To download an archive containing all the documents for this '
+    'version of Python in one of various formats, follow one of links '
+    'in this table.</p>'
+    '<table class="docutils align-default"><tbody>'
+    '<tr><td>PDF (A4)</td>'
+    '<td><a class="reference external" '
+    'href="archives/python-{version}-docs-pdf-a4.zip">Download</a></td></tr>'
+    '<tr><td>PDF (Letter)</td>'
+    '<td><a class="reference external" '
+    'href="archives/python-{version}-docs-pdf-letter.zip">Download</a>'
+    '</td></tr>'
+    '<tr><td>HTML</td>'
+    '<td><a class="reference external" '
+    'href="archives/python-{version}-docs-html.zip">Download</a></td></tr>'
+    '<tr><td>Plain text</td>'
+    '<td><a class="reference external" '
+    'href="archives/python-{version}-docs-text.zip">Download</a></td></tr>'
+    '<tr><td>EPUB</td>'
+    '<td><a class="reference external" '
+    'href="archives/python-{version}-docs.epub">Download</a></td></tr>'
+    '</tbody></table>'
+    '<p>These archives contain all the content in the documentation.</p>'
+    '<section id="problems"><h2>Problems</h2><p>Open an issue.</p>'
+    '</section></section></body></html>'
+)
+
+FILLER = 'Lorem ipsum dolor sit amet. ' * 40
+
+
+def pep_status(number):
+    """Пара (аббревиатура, статус) для PEP с заданным номером."""
+    return PEP_STATUSES[number % len(PEP_STATUSES)]
+
+
+def pep_index(count):
+    """Главная страница PEP с `count` строками в числовом индексе."""
+    return PEP_INDEX.format(rows=''.join(
+        PEP_INDEX_ROW.format(abbr=pep_status(number)[0], number=number)
+        for number in range(1, count + 1)
+    ))
+
+
+def sections(count):
+    """Разделы с текстом, кодом и списками для наполнения страницы."""
+    return ''.join(
+        SECTION.format(number=number, text=FILLER)
+        for number in range(count)
+    )
+
+
+def pep_page(number, section_count=1):
+    """Страница отдельного PEP."""
+    return PEP_PAGE.format(
+        number=number,
+        status=pep_status(number)[1],
+        sections=sections(section_count),
+    )
+
+
+def whats_new_index(versions):
+    """Оглавление раздела What's New."""
+    return WHATS_NEW_INDEX.format(items=''.join(
+        WHATS_NEW_ITEM.format(version=version) for version in versions
+    ))
+
+
+def whats_new_page(version, section_count=1):
+    """Страница What's New для одной версии."""
+    return WHATS_NEW_PAGE.format(
+        version=version,
+        slug=version.replace('.', '-'),
+        sections=sections(section_count),
+    )
+
+
+def download_page(version='3.12'):
+    """Страница загрузки архивов документации для версии."""
+    return DOWNLOAD_PAGE.format(version=version)
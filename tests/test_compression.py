@@ -0,0 +1,46 @@
+import logging
+import pickle
+
+import pytest
+
+try:
+    from src import compression
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `compression.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `compression.py`'
+
+PAGE = b'<tr><td>PEP</td><td>Final</td></tr>' * 200
+
+
+@pytest.mark.parametrize('method', ['none', 'gzip', 'zstd'])
+def test_compressor_round_trip(method):
+    if method == 'zstd':
+        pytest.importorskip('zstandard')
+    compressor = compression.Compressor(method, threshold=100)
+    stored = compressor.dumps(PAGE)
+    assert compressor.loads(stored) == PAGE
+    if method != 'none':
+        assert len(stored) < len(PAGE) / 5
+
+
+def test_compressor_threshold():
+    compressor = compression.Compressor('gzip', threshold=len(PAGE) + 1)
+    assert compressor.dumps(PAGE) == b'R' + PAGE, (
+        'Записи меньше порога должны сохраняться без сжатия'
+    )
+
+
+def test_compressor_reads_legacy_records():
+    record = pickle.dumps({'url': 'https://peps.python.org/'})
+    assert compression.Compressor().loads(record) == record, (
+        'Записи, сохранённые до включения сжатия, должны читаться как есть'
+    )
+
+
+def test_resolve_compression_fallback(monkeypatch, caplog):
+    monkeypatch.setattr(compression, 'find_spec', lambda name: None)
+    with caplog.at_level(logging.WARNING):
+        assert compression.resolve_compression('zstd') == 'gzip'
+    assert 'zstandard' in caplog.text
+    assert compression.resolve_compression('none') == 'none'
@@ -31,9 +31,17 @@ def test_configs_file():
     ),
     (
         argparse._StoreAction, ['-o', '--output'], 'output',
-        ('pretty', 'file'),
+        ('pretty', 'file', 'jsonl', 'parquet', 'sqlite'),
         'Дополнительные способы вывода данных'
     ),
+    (
+        argparse._StoreAction, ['-w', '--workers'], 'workers',
+        None, 'Количество потоков для загрузки страниц'
+    ),
+    (
+        argparse._StoreAction, ['--engine'], 'engine',
+        ('sync', 'async'), 'Движок загрузки страниц'
+    ),
 ])
 def test_configure_argument_parser(
         action,
@@ -66,3 +74,37 @@ def test_configure_argument_parser(
     assert got_action.help == help_str, (
         f'Укажите help-строку cli аргумента {got_action.dest}'
     )
+
+
+def test_cache_ttl_argument():
+    assert configs.cache_ttl('peps.python.org/pep-=86400') == (
+        'peps.python.org/pep-', 86400
+    )
+    assert configs.cache_ttl('a=b=-1') == ('a=b', -1)
+    for value in ('peps.python.org', '=10', 'x=soon', 'x=-2'):
+        with pytest.raises(argparse.ArgumentTypeError):
+            configs.cache_ttl(value)
+
+
+@pytest.mark.parametrize('option, valid, invalid', [
+    ('--retries', '0', '-1'),
+    ('--backoff', '0', '-0.5'),
+    ('--jitter', '0', 'nan'),
+    ('--timeout', '0.5', '0'),
+])
+def test_connection_arguments_range(option, valid, invalid):
+    parser = configs.configure_argument_parser(['pep'])
+    parser.parse_args(['pep', option, valid])
+    with pytest.raises(SystemExit):
+        parser.parse_args(['pep', option, invalid])
+
+
+def test_configure_logging_quiets_httpx(monkeypatch, tmp_path):
+    import logging
+
+    monkeypatch.setattr(configs, 'LOG_DIR', tmp_path)
+    monkeypatch.setattr(configs, 'LOG_FILE', tmp_path / 'parser.log')
+    configs.configure_logging()
+    assert not logging.getLogger('httpx').isEnabledFor(logging.INFO), (
+        'Строки httpx о каждом запросе не должны попадать в лог'
+    )
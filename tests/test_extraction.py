@@ -0,0 +1,75 @@
+import bs4
+import pytest
+
+try:
+    from src import extraction
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `extraction.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `extraction.py`'
+
+TABLE = (
+    '<table><tr><td>1</td><td><a href="pep-0001/">PEP 1</a></td></tr>'
+    '<tr><td>2</td><td><a href="pep-0002/">PEP 2</a></td></tr></table>'
+)
+
+
+def test_extraction_plan_rows():
+    plan = extraction.ExtractionPlan('tr', (
+        extraction.Field('td'),
+        extraction.Field('a', extraction.attribute('href')),
+        extraction.Field(get=lambda row: len(row.find_all('td'))),
+    ))
+    soup = bs4.BeautifulSoup(TABLE, 'html.parser')
+    assert plan.extract(soup) == [
+        ('1', 'pep-0001/', 2), ('2', 'pep-0002/', 2)
+    ]
+    assert plan.extract_one(soup) == ('1', 'pep-0001/', 2)
+
+
+def test_extraction_plan_cells():
+    plan = extraction.ExtractionPlan('tr', (
+        extraction.Field(cell=1),
+        extraction.Field('a', extraction.attribute('href'), cell=1),
+        extraction.Field(cell=0),
+    ), cells='td')
+    soup = bs4.BeautifulSoup(TABLE, 'html.parser')
+    assert plan.extract(soup) == [
+        ('PEP 1', 'pep-0001/', '1'), ('PEP 2', 'pep-0002/', '2')
+    ]
+
+
+def test_extraction_plan_whole_page():
+    plan = extraction.ExtractionPlan(None, (
+        extraction.Field('a', extraction.string),
+    ))
+    soup = bs4.BeautifulSoup(TABLE, 'html.parser')
+    assert plan.extract(soup) == [('PEP 1',)]
+    assert plan.extract_one(soup) == ('PEP 1',)
+
+
+def test_extraction_plan_missing_elements():
+    soup = bs4.BeautifulSoup(TABLE, 'html.parser')
+    with pytest.raises(BaseException) as excinfo:
+        extraction.ExtractionPlan('tr', (extraction.Field('dl'),)).extract(
+            soup
+        )
+    assert excinfo.typename == 'ParserFindTagException'
+    with pytest.raises(BaseException) as excinfo:
+        extraction.ExtractionPlan(
+            'dl', (extraction.Field('dd'),)
+        ).extract_one(soup)
+    assert excinfo.typename == 'ParserFindTagException'
+    assert extraction.ExtractionPlan('dl', ()).extract(soup) == []
+
+
+def test_definition():
+    soup = bs4.BeautifulSoup(
+        '<dl><dt>Author<span>:</span></dt><dd>Guido</dd>'
+        '<dt>Status<span>:</span></dt>\n<dd><abbr>Final</abbr></dd></dl>',
+        'html.parser'
+    )
+    assert extraction.definition('Status')(soup) == 'Final'
+    assert extraction.definition('Author', extraction.text)(soup) == 'Guido'
+    with pytest.raises(extraction.ParserFindTagException):
+        extraction.definition('Type')(soup)
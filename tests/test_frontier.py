@@ -0,0 +1,114 @@
+import threading
+import time
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+try:
+    from src import frontier, main
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `frontier.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `frontier.py`'
+
+
+class SlowSession:
+    """Сессия-заглушка: считает запросы и отвечает с задержкой."""
+
+    def __init__(self, delay=0.05, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, **kwargs):
+        with self._lock:
+            self.calls.append(url)
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return object()
+
+
+@pytest.mark.parametrize('url, expected', [
+    (
+        'https://docs.python.org/3/whatsnew/3.12.html#summary',
+        'https://docs.python.org/3/whatsnew/3.12.html',
+    ),
+    ('HTTPS://Docs.Python.org:443/3/index.html', 'https://docs.python.org/3/'),
+    ('https://peps.python.org/pep-0008', 'https://peps.python.org/pep-0008/'),
+    (
+        'https://docs.python.org/3/./whatsnew/',
+        'https://docs.python.org/3/whatsnew/',
+    ),
+    ('https://example.org/api/items', 'https://example.org/api/items'),
+])
+def test_canonical_url(url, expected):
+    assert frontier.canonical_url(url) == expected
+
+
+def test_unique_urls():
+    assert frontier.unique_urls([
+        'https://peps.python.org/pep-0008/',
+        'https://docs.python.org/3/',
+        'https://peps.python.org/pep-0008#id1',
+        'https://docs.python.org/3/index.html',
+    ]) == ['https://peps.python.org/pep-0008/', 'https://docs.python.org/3/']
+
+
+def test_frontier_coalesces_concurrent_requests():
+    session = SlowSession()
+    shared = frontier.Frontier(session)
+    urls = ['https://peps.python.org/pep-0008/',
+            'https://peps.python.org/pep-0008#id1'] * 4
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(shared.get, urls))
+    assert session.calls == ['https://peps.python.org/pep-0008/'], (
+        'Одновременные запросы одной страницы должны объединяться'
+    )
+    assert all(response is responses[0] for response in responses)
+    assert (shared.requested, shared.coalesced) == (1, 7)
+    shared.get('https://peps.python.org/pep-0008/', headers={'A': '1'})
+    assert len(session.calls) == 2, (
+        'Запросы с разными заголовками не должны объединяться'
+    )
+
+
+def test_frontier_passes_extra_arguments():
+    session = SlowSession()
+    shared = frontier.Frontier(session)
+    url = 'https://example.org/search'
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(
+            lambda query: shared.get(url, params={'q': query}), 'ab'
+        ))
+    assert session.calls == [url, url], (
+        'Запросы с разными params не должны объединяться'
+    )
+    assert shared.requested == shared.coalesced == 0
+
+
+def test_frontier_shares_errors():
+    shared = frontier.Frontier(SlowSession(error=ConnectionError('нет сети')))
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(shared.get, 'https://docs.python.org/3/')
+            for _ in range(4)
+        ]
+    for future in futures:
+        with pytest.raises(ConnectionError):
+            future.result()
+    assert shared.session.calls == ['https://docs.python.org/3/']
+
+
+@pytest.mark.parametrize('mode', ['pep', 'whats-new', 'latest-versions'])
+def test_frontier_same_result(site_session, mode):
+    function = main.MODE_TO_FUNCTION[mode]
+    expected = list(function(site_session(pep_count=12)))
+    shared = frontier.Frontier(site_session(pep_count=12))
+    assert list(function(shared, Namespace(workers=4))) == expected, (
+        'Результат не должен зависеть от того, идут ли запросы '
+        'через общую очередь адресов'
+    )
+    assert shared.coalesced == 0
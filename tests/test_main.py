@@ -1,6 +1,16 @@
+import multiprocessing
+import sqlite3
+import subprocess
+import sys
+import time
+from argparse import Namespace
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import bs4
 import pytest
+import requests
 
 try:
     from src import main
@@ -35,9 +45,10 @@ def test_main_file():
 def test_whats_new(mock_session):
     got = main.whats_new(mock_session)
     header = ('Ссылка на статью', 'Заголовок', 'Редактор, Автор')
-    assert isinstance(got, list), (
-        'Функция `whats_new` должна возвращать объект типа `list`'
+    assert isinstance(got, Iterator), (
+        'Функция `whats_new` должна возвращать итератор строк результата'
     )
+    got = list(got)
     assert len(got) > 0, (
         'Убедитесь что функция `whats_new` модуля `main.py` '
         'возвращает непустой список'
@@ -53,12 +64,249 @@ def test_whats_new(mock_session):
     )
 
 
+def test_pep(site_session):
+    got = list(main.pep(site_session(pep_count=16)))
+    assert got[0] == ('Статус', 'Количество')
+    assert got[-1] == ('Всего', 16), (
+        'Функция `pep` должна учитывать каждый PEP из числового индекса'
+    )
+    assert ('Draft', 2) in got
+
+
+def test_pep_metadata(site_session):
+    got = list(main.pep(site_session(pep_count=4), Namespace(
+        pep_metadata=True, workers=2
+    )))
+    assert got[0] == (
+        'Номер', 'Название', 'Автор', 'Статус', 'Тип', 'Создан',
+        'Версия Python', 'Обсуждения', 'Заменяет', 'Заменён на'
+    )
+    assert len(got) == 5, (
+        'С `--pep-metadata` функция `pep` должна отдавать строку на PEP'
+    )
+    assert got[1] == (
+        1, 'Sample PEP 1', 'Guido van Rossum', 'Final', 'Standards Track',
+        '2000-06-13', '2.1', '16-Jun-2000, 24-Jun-2000', '', ''
+    )
+    assert [row[0] for row in got[1:]] == [1, 2, 3, 4]
+
+
+def test_pep_metadata_sqlite(site_session, monkeypatch, tmp_path):
+    from src import outputs
+
+    monkeypatch.setattr(outputs, 'BASE_DIR', tmp_path)
+    for pep_metadata in (False, True, False):
+        cli_args = Namespace(mode='pep', output='sqlite',
+                             pep_metadata=pep_metadata)
+        outputs.control_output(
+            main.pep(site_session(pep_count=4), cli_args),
+            main.mode_args(cli_args, 'pep')
+        )
+    connection = sqlite3.connect(tmp_path / 'results' / 'results.sqlite')
+    tables = connection.execute(
+        'SELECT name FROM sqlite_master WHERE type = "table" ORDER BY name'
+    ).fetchall()
+    assert tables == [('pep',), ('pep_metadata',)], (
+        'Карточки PEP и итоги по статусам должны храниться '
+        'в разных таблицах'
+    )
+
+
+def test_pep_workers_same_result(site_session, caplog):
+    serial = list(main.pep(site_session(pep_count=16)))
+    serial_logs = caplog.messages
+    caplog.clear()
+    parallel = list(
+        main.pep(site_session(pep_count=16), Namespace(workers=4))
+    )
+    assert parallel == serial, (
+        'Результат `pep` не должен зависеть от количества потоков'
+    )
+    assert caplog.messages == serial_logs, (
+        'Порядок сообщений о несовпадающих статусах должен '
+        'совпадать с порядком PEP в индексе'
+    )
+
+
+def test_pep_workers_speedup(site_session):
+    start = time.perf_counter()
+    list(main.pep(site_session(pep_count=8, delay=0.05)))
+    serial_time = time.perf_counter() - start
+    start = time.perf_counter()
+    list(main.pep(
+        site_session(pep_count=8, delay=0.05), Namespace(workers=8)
+    ))
+    parallel_time = time.perf_counter() - start
+    assert parallel_time < serial_time / 2, (
+        'Загрузка страниц PEP в несколько потоков должна быть быстрее '
+        f'последовательной: {parallel_time:.2f}s / {serial_time:.2f}s'
+    )
+
+
+def test_pep_broken_link(site_session, caplog):
+    session = site_session(pep_count=4)
+    session.mock_adapter.register_uri(
+        'GET',
+        'https://peps.python.org/pep-0002/',
+        exc=requests.exceptions.ConnectTimeout,
+    )
+    got = list(main.pep(session, Namespace(workers=2)))
+    assert got[-1] == ('Всего', 3)
+    assert any('pep-0002' in message for message in caplog.messages)
+
+
+def test_pep_incremental(site_session, monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    cli_args = Namespace(incremental=True, workers=2)
+    session = site_session(pep_count=6)
+    first = list(main.pep(session, cli_args))
+    assert first == list(main.pep(site_session(pep_count=6)))
+    parsed = []
+    monkeypatch.setattr(
+        'bs4.BeautifulSoup', lambda *args: parsed.append(args)
+    )
+    second = list(main.pep(session, cli_args))
+    assert second == first, (
+        'Для неизменившихся страниц должны использоваться '
+        'сохранённые статусы'
+    )
+    assert not parsed, (
+        'Страницы, вернувшие 304, не должны разбираться заново'
+    )
+    conditional = session.mock_adapter.request_history[-7:]
+    assert all('If-None-Match' in request.headers for request in conditional)
+
+
+def test_pep_resume_after_crash(site_session, monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    expected = list(main.pep(site_session(pep_count=6)))
+    crashed = site_session(pep_count=6)
+    crashed.mock_adapter.register_uri(
+        'GET', 'https://peps.python.org/pep-0004/', exc=RuntimeError
+    )
+    with pytest.raises(RuntimeError):
+        list(main.pep(crashed, Namespace(checkpoint=True)))
+    assert (tmp_path / 'pep_checkpoint.jsonl').exists()
+    session = site_session(pep_count=6)
+    got = list(main.pep(session, Namespace(checkpoint=True, resume=True)))
+    assert got == expected, (
+        'После продолжения обхода итоги должны учитывать все PEP'
+    )
+    fetched = [
+        request.url for request in session.mock_adapter.request_history
+    ]
+    assert fetched == ['https://peps.python.org/'] + [
+        f'https://peps.python.org/pep-{number:04d}/'
+        for number in range(4, 7)
+    ], 'Уже обработанные PEP не должны загружаться повторно'
+    assert not (tmp_path / 'pep_checkpoint.jsonl').exists(), (
+        'После успешного обхода журнал должен удаляться'
+    )
+
+
+def test_pep_profile(site_session):
+    from src.metrics import RunProfile
+
+    session = site_session(pep_count=6)
+    cold = RunProfile()
+    list(main.pep(session, Namespace(run_profile=cold, workers=2)))
+    warm = RunProfile()
+    list(main.pep(session, Namespace(run_profile=warm, workers=2)))
+    assert cold.summary()['requests'] == 7
+    assert cold.summary()['parses'] == 7
+    assert cold.summary()['hit_ratio'] == 0
+    assert warm.summary()['hit_ratio'] == 1, (
+        'Ответы из кеша requests_cache должны учитываться в профиле'
+    )
+
+
+@pytest.mark.parametrize('mode', ['pep', 'whats-new', 'latest-versions'])
+def test_parsed_cache_warm_run(site_session, monkeypatch, tmp_path, mode):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    cli_args = Namespace(parsed_cache=True, workers=2)
+    session = site_session(pep_count=6)
+    function = main.MODE_TO_FUNCTION[mode]
+    first = list(function(session, cli_args))
+    parsed = []
+    monkeypatch.setattr(
+        'bs4.BeautifulSoup', lambda *args: parsed.append(args)
+    )
+    assert list(function(session, cli_args)) == first
+    assert not parsed, (
+        'При тёплом запуске HTML не должен разбираться повторно'
+    )
+
+
+@pytest.mark.parametrize('mode', ['pep', 'whats-new', 'latest-versions'])
+def test_parser_backend_same_result(site_session, mode):
+    pytest.importorskip('lxml')
+    function = main.MODE_TO_FUNCTION[mode]
+    expected = list(function(site_session(pep_count=12)))
+    got = list(function(
+        site_session(pep_count=12), Namespace(parser_backend='lxml')
+    ))
+    assert got == expected, (
+        'Результат не должен зависеть от выбранного парсера HTML'
+    )
+
+
+@pytest.mark.parametrize('mode', ['pep', 'whats-new', 'latest-versions'])
+def test_parse_processes_same_result(site_session, mode):
+    function = main.MODE_TO_FUNCTION[mode]
+    expected = list(function(site_session(pep_count=12)))
+    with ProcessPoolExecutor(
+        max_workers=2, mp_context=multiprocessing.get_context('spawn')
+    ) as pool:
+        got = list(function(
+            site_session(pep_count=12),
+            Namespace(workers=4, parse_pool=pool)
+        ))
+    assert got == expected, (
+        'Разбор страниц в пуле процессов должен давать ту же таблицу'
+    )
+
+
+@pytest.mark.parametrize('mode', ['pep', 'whats-new'])
+def test_async_engine_same_result(site_session, async_site_session, mode):
+    function = main.MODE_TO_FUNCTION[mode]
+    expected = list(function(site_session(pep_count=12)))
+    got = list(function(
+        async_site_session(pep_count=12), Namespace(workers=4)
+    ))
+    assert got == expected, (
+        'Асинхронный движок должен давать ту же таблицу, что и синхронный'
+    )
+
+
+def test_async_engine_incremental_fetches_once(
+    async_site_session, monkeypatch, tmp_path
+):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    session = async_site_session(pep_count=4)
+    list(main.pep(session, Namespace(incremental=True, workers=2)))
+    urls = [str(request.url) for request in session.request_history]
+    assert len(urls) == 5 and len(set(urls)) == 5, (
+        'С --incremental каждая страница должна запрашиваться один раз'
+    )
+
+
+@pytest.mark.parametrize('mode', ['whats-new', 'download'])
+def test_async_engine_prefetches_parsed_pages(
+    async_site_session, monkeypatch, tmp_path, mode
+):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    session = async_site_session(pep_count=4)
+    list(main.MODE_TO_FUNCTION[mode](session) or ())
+    urls = [str(request.url) for request in session.request_history]
+    assert main.MAIN_DOC_URL not in urls, (
+        'Заранее должны загружаться только страницы, которые разбираются'
+    )
+    assert len(urls) == len(set(urls))
+
+
 @pytest.mark.skip()
 def test_latest_versions(mock_session):
-    got = main.latest_versions(mock_session)
-    assert isinstance(got, list), (
-        'Функция `latest_versions` должна возвращать объект типа `list`'
-    )
+    got = list(main.latest_versions(mock_session))
     assert isinstance(got[0], tuple), (
         'Функция `latest_versions` должна вернуть список `result`, '
         'элементами которого должны быть объекты типа `tuple`'
@@ -114,6 +362,202 @@ def test_download(monkeypatch, tmp_path, mock_session):
     )
 
 
+def test_download_streaming(monkeypatch, tmp_path, site_session):
+    from conftest import ARCHIVE_CONTENT
+
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    main.download(site_session())
+    archive = tmp_path / 'downloads' / 'python-3.12-docs-pdf-a4.zip'
+    assert archive.read_bytes() == ARCHIVE_CONTENT
+    assert [path.name for path in archive.parent.iterdir()] == [archive.name]
+
+
+def test_download_streaming_async(monkeypatch, tmp_path, async_site_session):
+    from conftest import ARCHIVE_CONTENT
+
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    downloads = tmp_path / 'downloads'
+    downloads.mkdir()
+    (downloads / 'python-3.12-docs-pdf-a4.zip.part').write_bytes(
+        ARCHIVE_CONTENT[:1000]
+    )
+    session = async_site_session()
+    main.download(session)
+    archive = downloads / 'python-3.12-docs-pdf-a4.zip'
+    assert archive.read_bytes() == ARCHIVE_CONTENT, (
+        'Асинхронный движок должен загружать архив потоком'
+    )
+    assert [path.name for path in downloads.iterdir()] == [archive.name]
+    request = session.request_history[-1]
+    assert request.headers['Range'] == 'bytes=1000-', (
+        'Недокачанный архив должен догружаться с места остановки'
+    )
+    assert session.cache.get(str(request.url)) is None, (
+        'Архивы не должны попадать в кеш ответов'
+    )
+
+
+def test_download_formats(monkeypatch, tmp_path, site_session):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    session = site_session()
+    cli_args = Namespace(formats=['pdf-a4', 'html', 'epub'], workers=3)
+    main.download(session, cli_args)
+    names = sorted(path.name for path in (tmp_path / 'downloads').iterdir())
+    assert names == [
+        'python-3.12-docs-html.zip',
+        'python-3.12-docs-pdf-a4.zip',
+        'python-3.12-docs.epub',
+    ]
+    history = session.mock_adapter.request_history
+    first_run = len(history)
+    main.download(session, cli_args)
+    methods = [
+        request.method for request in history[first_run:]
+        if 'archives' in request.url
+    ]
+    assert methods == ['HEAD'] * 3, (
+        'Архивы, совпадающие с удалёнными, не должны загружаться повторно'
+    )
+
+
+def test_whats_new_streams_rows(site_session):
+    rows = main.whats_new(site_session(delay=0.05))
+    start = time.perf_counter()
+    assert next(rows) == ('Ссылка на статью', 'Заголовок', 'Редактор, Автор')
+    assert time.perf_counter() - start < 0.05, (
+        'Заголовок таблицы должен отдаваться до загрузки страниц'
+    )
+    assert len(list(rows)) == 3
+
+
+def test_whats_new_versions(site_session, monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    parsed = []
+
+    class CountingSoup(bs4.BeautifulSoup):
+        def __init__(self, *args, **kwargs):
+            parsed.append(args)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr('bs4.BeautifulSoup', CountingSoup)
+    session = site_session()
+    got = list(main.whats_new(
+        session, Namespace(versions=['all'], parsed_cache=True)
+    ))
+    links = [row[0] for row in got[1:]]
+    assert sorted(links) == sorted(
+        f'https://docs.python.org/{version}/whatsnew/{article}.html'
+        for version in ('3.13', '3.12', '3.11')
+        for article in ('3.12', '3.11', '3.10', 'changelog')
+    ), 'Статьи каждой версии должны попадать в результат'
+    fetched = [
+        request.url for request in session.mock_adapter.request_history
+    ]
+    assert len(fetched) == len(set(fetched)) == 16
+    assert len(parsed) == 6, (
+        'Одинаковые страницы разных версий должны разбираться один раз'
+    )
+
+
+def test_download_sha256_several_archives(
+    monkeypatch, tmp_path, site_session, caplog
+):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    main.download(site_session(), Namespace(
+        formats=['html', 'epub'], sha256='0' * 64, workers=2
+    ))
+    assert len(list((tmp_path / 'downloads').iterdir())) == 2
+    assert any('--sha256' in message for message in caplog.messages), (
+        'Если выбрано несколько архивов, пропуск проверки --sha256 '
+        'должен попадать в лог'
+    )
+
+
+def test_download_versions(monkeypatch, tmp_path, site_session):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    main.download(site_session(), Namespace(
+        versions=['3.12', '3.11', '2.7'], formats=['html', 'epub'], workers=4
+    ))
+    assert sorted(
+        path.name for path in (tmp_path / 'downloads').iterdir()
+    ) == [
+        'python-3.11-docs-html.zip',
+        'python-3.11-docs.epub',
+        'python-3.12-docs-html.zip',
+        'python-3.12-docs.epub',
+    ]
+
+
+def test_run_modes(site_session, capsys):
+    from src.frontier import Frontier
+
+    def main_page_requests(session):
+        return sum(
+            request.url == main.MAIN_DOC_URL
+            for request in session.mock_adapter.request_history
+        )
+
+    modes = ['pep', 'whats-new', 'latest-versions']
+    cli_args = Namespace(modes=modes, workers=4, versions=['all'])
+    expected = []
+    separate_requests = 0
+    for mode in modes:
+        session = site_session(pep_count=8)
+        expected.extend(main.MODE_TO_FUNCTION[mode](session, cli_args))
+        separate_requests += main_page_requests(session)
+    assert separate_requests == 2, (
+        'Главная страница документации нужна whats-new с --versions '
+        'и latest-versions'
+    )
+    capsys.readouterr()
+    session = Frontier(site_session(pep_count=8))
+    main.run_modes(session, cli_args)
+    printed = capsys.readouterr().out.splitlines()
+    assert printed == [' '.join(map(str, row)) for row in expected], (
+        'Команда all должна выводить результаты режимов по порядку, '
+        'как при отдельных запусках'
+    )
+    assert main_page_requests(session) == 1, (
+        'Страница, нужная нескольким режимам, должна загружаться один раз'
+    )
+
+
+def test_run_modes_failed_mode(site_session, monkeypatch, capsys, caplog):
+    def broken(session, cli_args=None):
+        raise ConnectionError('нет сети')
+
+    monkeypatch.setitem(main.MODE_TO_FUNCTION, 'whats-new', broken)
+    main.run_modes(
+        site_session(pep_count=4),
+        Namespace(modes=['whats-new', 'pep'], workers=2)
+    )
+    assert capsys.readouterr().out.splitlines()[-1] == 'Всего 4', (
+        'Ошибка одного режима не должна останавливать остальные'
+    )
+    assert any('whats-new' in message for message in caplog.messages)
+
+
+def test_cache_stats(site_session):
+    session = site_session(pep_count=4)
+    list(main.pep(session))
+    got = list(main.cache_stats(session, Namespace(cache_max_size=5)))
+    assert got[0] == ('Показатель', 'Значение')
+    assert ('Ответов', 5) in got
+    assert ('Ограничение, МБ', 5) in got
+
+
+def test_cache_stats_async_frontier(async_site_session):
+    from src.frontier import Frontier
+
+    session = Frontier(async_site_session(pep_count=4))
+    list(main.pep(session))
+    got = dict(main.cache_stats(session))
+    assert got['Ответов'] == 5, (
+        'Статистика кеша асинхронного движка должна работать '
+        'и с сессией в обёртке Frontier'
+    )
+
+
 def test_mode_to_function():
     got = main.MODE_TO_FUNCTION
     assert isinstance(got, dict), (
@@ -142,3 +586,25 @@ def test_mode_to_function():
             'В модуле `main.py` в объекте `MODE_TO_FUNCTION` '
             f'нет значения {func}'
         )
+
+
+def test_main_import_is_lazy():
+    from conftest import SRC_DIR
+
+    heavy = ('bs4', 'soupsieve', 'requests', 'requests_cache', 'prettytable',
+             'tqdm')
+    result = subprocess.run(
+        [
+            sys.executable, '-c',
+            'import sys, main; '
+            f'print(*[name for name in {heavy!r} if name in sys.modules])'
+        ],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.split() == [], (
+        'Импорт `main.py` не должен загружать библиотеки для запросов, '
+        'разбора и вывода: они импортируются при первом использовании'
+    )
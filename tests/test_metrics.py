@@ -0,0 +1,42 @@
+import json
+
+try:
+    from src import metrics
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `metrics.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `metrics.py`'
+
+from src.sessions import build_response
+
+
+def test_percentile():
+    values = [0.1 * number for number in range(1, 101)]
+    assert metrics.percentile(values, 50) == values[49]
+    assert metrics.percentile(values, 99) == values[98]
+    assert metrics.percentile([], 95) == 0.0
+
+
+def test_run_profile_summary(tmp_path):
+    profile = metrics.RunProfile()
+    for number, from_cache in enumerate((False, True, True, False)):
+        profile.record_fetch(
+            f'https://a/{number}',
+            number * 0.1,
+            build_response(
+                f'https://a/{number}', 200, {}, b'x' * 10, from_cache
+            )
+        )
+    with profile.parsing('https://a/0', 'extract'):
+        pass
+    summary = profile.summary()
+    assert summary['requests'] == 4
+    assert summary['hit_ratio'] == 0.5
+    assert summary['bytes'] == 40
+    assert summary['parses'] == 1
+    assert summary['slowest'][0]['url'] == 'https://a/3'
+    assert 'https://a/3' in profile.report()
+    profile.dump(tmp_path / 'profile.json')
+    dumped = json.loads((tmp_path / 'profile.json').read_text())
+    assert dumped['summary']['requests'] == 4
+    assert len(dumped['fetches']) == 4
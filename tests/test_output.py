@@ -1,3 +1,5 @@
+import json
+import sqlite3
 from argparse import Namespace
 from datetime import datetime
 from pathlib import Path
@@ -92,3 +94,77 @@ def test_output_file():
     assert hasattr(outputs, 'file_output'), (
         'Напишите функцию `file_output` в модуле `output.py`'
     )
+
+
+def test_file_output_keeps_rows_on_crash(monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+
+    def crawl():
+        yield ('Статус', 'Количество')
+        yield ('Final', 1)
+        raise ConnectionError('Обрыв соединения')
+
+    with pytest.raises(ConnectionError):
+        outputs.control_output(crawl(), cli_args('pep', 'file'))
+    output_file, = (tmp_path / 'results').iterdir()
+    assert output_file.read_text(encoding='utf-8').splitlines() == [
+        '"Статус","Количество"', '"Final","1"'
+    ], 'Строки должны записываться в файл по мере поступления'
+
+
+def test_default_output_streams_rows(capsys):
+    def crawl():
+        yield ('Статус', 'Количество')
+        assert 'Статус' in capsys.readouterr().out, (
+            'Строка должна выводиться до получения следующей'
+        )
+        yield ('Всего', 0)
+
+    outputs.control_output(crawl(), cli_args('pep', None))
+
+
+PEP_ROWS = [
+    ('Статус', 'Количество'), ('Final', 246), ('Active', 36), ('Всего', 282)
+]
+
+
+def test_jsonl_output(monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    outputs.control_output(iter(PEP_ROWS), cli_args('pep', 'jsonl'))
+    output_file, = (tmp_path / 'results').glob('pep_*.jsonl')
+    lines = output_file.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {'Статус': status, 'Количество': count}
+        for status, count in PEP_ROWS[1:]
+    ]
+
+
+def test_parquet_output(monkeypatch, tmp_path):
+    parquet = pytest.importorskip('pyarrow.parquet')
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    monkeypatch.setattr(outputs, 'OUTPUT_BATCH_SIZE', 2)
+    outputs.control_output(iter(PEP_ROWS), cli_args('pep', 'parquet'))
+    output_file, = (tmp_path / 'results').glob('pep_*.parquet')
+    assert parquet.ParquetFile(output_file).num_row_groups == 2, (
+        'Строки должны записываться в Parquet пачками'
+    )
+    table = parquet.read_table(output_file)
+    assert table.column_names == ['Статус', 'Количество']
+    assert str(table.schema.field('Количество').type) == 'int64', (
+        'Числовые столбцы должны сохраняться с числовым типом'
+    )
+    assert table.to_pylist()[-1] == {'Статус': 'Всего', 'Количество': 282}
+
+
+def test_sqlite_output_upsert(monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    outputs.control_output(iter(PEP_ROWS), cli_args('pep', 'sqlite'))
+    outputs.control_output(
+        iter([PEP_ROWS[0], ('Final', 247), ('Draft', 1)]),
+        cli_args('pep', 'sqlite')
+    )
+    connection = sqlite3.connect(tmp_path / 'results' / 'results.sqlite')
+    rows = dict(connection.execute('SELECT * FROM pep'))
+    assert rows == {'Final': 247, 'Active': 36, 'Всего': 282, 'Draft': 1}, (
+        'Повторная запись должна обновлять строки по первому столбцу'
+    )
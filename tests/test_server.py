@@ -0,0 +1,114 @@
+import threading
+from argparse import Namespace
+from functools import partial
+
+import pytest
+import requests
+import requests_mock
+
+try:
+    from src import main, metrics, server, sessions
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `server.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `server.py`'
+
+
+@pytest.fixture
+def result_server():
+    """Фабрика запущенных серверов результатов на свободном порту."""
+    servers = []
+
+    def _result_server(producers):
+        result = server.ResultServer(('127.0.0.1', 0), producers, 3600)
+        threading.Thread(target=result.serve_forever, daemon=True).start()
+        servers.append(result)
+        return result
+
+    yield _result_server
+    for result in servers:
+        result.shutdown()
+        result.stop()
+
+
+def test_result_server_serves_tables(result_server, site_session):
+    results = result_server({
+        'pep': partial(main.pep, site_session(pep_count=4)),
+    })
+    response = requests.get(results.url + 'pep')
+    assert response.status_code == 503, (
+        'До первого обновления сервер должен отвечать 503'
+    )
+    results.refresh_all()
+    data = requests.get(results.url + 'pep').json()
+    assert data['name'] == 'pep'
+    assert data['rows'][-1] == {'Статус': 'Всего', 'Количество': 4}
+    index = requests.get(results.url).json()
+    assert index['pep']['updated'] == data['updated']
+    assert requests.get(results.url + 'download').status_code == 404
+
+
+def test_result_server_keeps_table_on_error(result_server):
+    tables = [[('Версия',), ('3.12',)]]
+
+    def produce():
+        if not tables:
+            raise ConnectionError('нет сети')
+        return tables.pop()
+
+    results = result_server({'versions': produce})
+    results.refresh_all()
+    results.refresh_all()
+    data = requests.get(results.url + 'versions').json()
+    assert data['rows'] == [{'Версия': '3.12'}], (
+        'Если обновление не удалось, сервер должен отдавать прежнюю таблицу'
+    )
+
+
+def test_result_server_background_refresh():
+    calls = []
+    results = server.ResultServer(
+        ('127.0.0.1', 0),
+        {'calls': lambda: calls.append(1) or [('Вызов',)]},
+        refresh=0.05
+    )
+    results.start_refresh()
+    threading.Event().wait(0.3)
+    results.stop()
+    assert len(calls) >= 3, (
+        'Таблицы должны обновляться в фоне с заданным периодом'
+    )
+
+
+def test_serve_refresh_trims_cache_and_resets_profile():
+    session = sessions.create_session(
+        Namespace(cache_backend='memory', cache_max_size=1)
+    )
+    adapter = requests_mock.Adapter()
+    for name in 'ab':
+        adapter.register_uri(
+            'GET', f'https://example.org/{name}', content=b'x' * 600_000
+        )
+    session.mount('https://', adapter)
+    profile = metrics.RunProfile()
+    cli_args = Namespace(cache_max_size=1, run_profile=profile)
+
+    def produce():
+        for name in 'ab':
+            url = f'https://example.org/{name}'
+            profile.record_fetch(url, 0.1, session.get(url))
+        return [('Страниц',), (2,)]
+
+    results = server.ResultServer(
+        ('127.0.0.1', 0),
+        {'pages': produce},
+        after_refresh=partial(main.finish_refresh, session, cli_args)
+    )
+    results.refresh_all()
+    results.stop()
+    assert dict(sessions.cache_summary(session))['Ответов'] == 1, (
+        'serve должен ограничивать кеш после каждого цикла обновлений'
+    )
+    assert profile.summary()['requests'] == 0, (
+        'Профиль serve должен начинаться заново после каждого цикла'
+    )
@@ -0,0 +1,361 @@
+import io
+import socket
+import threading
+import time
+from argparse import Namespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests_mock
+
+import pytest
+
+try:
+    from src import sessions, utils
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `sessions.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `sessions.py`'
+
+
+@pytest.fixture(autouse=True)
+def cache_in_tmp_path(monkeypatch, tmp_path):
+    """Файлы кеша сессий создаются во временной директории."""
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def silent_server():
+    """Сервер, который принимает соединения и ничего не отвечает."""
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen()
+    connections = []
+
+    def accept():
+        while True:
+            try:
+                connections.append(server.accept()[0])
+            except OSError:
+                return
+
+    threading.Thread(target=accept, daemon=True).start()
+    yield 'http://127.0.0.1:{}/'.format(server.getsockname()[1])
+    server.close()
+    for connection in connections:
+        connection.close()
+
+
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+    """Отвечает 429 с Retry-After на первые throttled запросов."""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.times.append(time.monotonic())
+            throttled = len(server.times) <= server.throttled
+        if throttled:
+            self.send_response(429)
+            self.send_header('Retry-After', str(server.retry_after))
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def throttling_server():
+    """Фабрика серверов-заглушек, отвечающих 429."""
+    servers = []
+
+    def _throttling_server(throttled=0, retry_after=0):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), ThrottlingHandler)
+        server.lock = threading.Lock()
+        server.times = []
+        server.throttled = throttled
+        server.retry_after = retry_after
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        server.url = 'http://127.0.0.1:{}/'.format(server.server_address[1])
+        return server
+
+    yield _throttling_server
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_create_session_adapter():
+    session = sessions.create_session(Namespace(
+        pool_size=32, keep_alive=True, retries=5, backoff=0.1,
+        jitter=0.2, timeout=7,
+    ))
+    adapter = session.get_adapter('https://peps.python.org/')
+    assert isinstance(adapter, sessions.TunedHTTPAdapter)
+    assert adapter._pool_maxsize == 32
+    assert adapter.timeout == 7
+    assert adapter.max_retries.total == 5
+    assert 502 in adapter.max_retries.status_forcelist
+    assert 503 not in adapter.max_retries.status_forcelist, (
+        'Ответы 503 повторяет планировщик запросов с учётом Retry-After'
+    )
+    assert adapter.throttle_retries == 5
+    assert adapter.scheduler.concurrency == 10
+
+
+def test_create_session_no_keep_alive():
+    session = sessions.create_session(Namespace(keep_alive=False))
+    assert session.headers['Connection'] == 'close'
+    assert not session.get_adapter('http://localhost/').keep_alive
+
+
+def test_jitter_retry_backoff():
+    retry = sessions.JitterRetry(total=5, backoff_factor=1, jitter=0.5)
+    assert retry.get_backoff_time() == 0
+    retry = retry.increment('GET', '/').increment('GET', '/')
+    assert retry.jitter == 0.5
+    assert 2 <= retry.get_backoff_time() <= 2.5
+
+
+def test_timeout_on_stuck_socket(silent_server):
+    session = sessions.create_session(Namespace(timeout=0.2, retries=0))
+    start = time.perf_counter()
+    with pytest.raises(ConnectionError):
+        utils.get_response(session, silent_server)
+    assert time.perf_counter() - start < 2, (
+        'Запрос к зависшему серверу должен прерываться по таймауту'
+    )
+
+
+def test_async_engine_disk_cache(async_site_session):
+    session = async_site_session(pep_count=3)
+    first = session.get('https://peps.python.org/pep-0001/')
+    second = session.get('https://peps.python.org/pep-0001/')
+    assert not first.from_cache and second.from_cache
+    assert second.text == first.text
+    session.cache.clear()
+    assert not session.get('https://peps.python.org/pep-0001/').from_cache
+
+
+def saved_response(cache, url, size=10):
+    cache.save(url, sessions.build_response(url, 200, {}, b'x' * size))
+
+
+def test_async_cache_ttl(monkeypatch, tmp_path):
+    clock = [1000.0]
+    monkeypatch.setattr(sessions.time, 'time', lambda: clock[0])
+    cache = sessions.ResponseCache(
+        tmp_path / 'cache.sqlite', sessions.cache_ttls()
+    )
+    saved_response(cache, 'https://peps.python.org/')
+    saved_response(cache, 'https://peps.python.org/pep-0008/')
+    saved_response(cache, 'https://example.org/')
+    clock[0] += 2 * 60 * 60
+    assert cache.get('https://peps.python.org/') is None, (
+        'Индекс PEP в кеше асинхронного движка должен устаревать'
+    )
+    assert cache.get('https://peps.python.org/pep-0008/') is not None
+    assert cache.get('https://example.org/') is not None
+    assert cache.summary() == (3, 1, 30)
+
+
+def test_async_cache_trim(monkeypatch, tmp_path):
+    clock = [1000.0]
+    monkeypatch.setattr(sessions.time, 'time', lambda: clock[0])
+    session = sessions.AsyncSession(cache_path=tmp_path / 'cache.sqlite')
+    for url in ('https://example.org/a', 'https://example.org/b',
+                'https://example.org/c'):
+        clock[0] += 1
+        saved_response(session.cache, url, size=100)
+    clock[0] += 1
+    session.cache.get('https://example.org/a')
+    assert sessions.trim_cache(session, 250) == 1
+    assert session.cache.get('https://example.org/b') is None, (
+        'Из кеша должен вытесняться давно не использованный ответ'
+    )
+    assert session.cache.summary() == (2, 0, 200)
+    session.close()
+
+
+def test_retry_after_on_429(throttling_server):
+    server = throttling_server(throttled=2, retry_after=0.2)
+    session = sessions.create_session(Namespace(retries=3))
+    response = session.get(server.url, headers={'Cache-Control': 'no-store'})
+    assert response.status_code == 200
+    assert len(server.times) == 3
+    assert server.times[1] - server.times[0] >= 0.2, (
+        'Повторный запрос должен ждать время из Retry-After'
+    )
+
+
+def test_429_retries_exhausted(throttling_server):
+    server = throttling_server(throttled=10)
+    session = sessions.create_session(Namespace(retries=1, backoff=0.01))
+    response = session.get(server.url, headers={'Cache-Control': 'no-store'})
+    assert response.status_code == 429
+    assert len(server.times) == 2
+
+
+def test_rate_limit_per_host(throttling_server):
+    server = throttling_server()
+    session = sessions.create_session(Namespace(rate_limit=20, workers=4))
+    threads = [
+        threading.Thread(target=lambda: session.get(
+            server.url, headers={'Cache-Control': 'no-store'}
+        ))
+        for _ in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert server.times[-1] - server.times[0] >= 0.2, (
+        'Запросы к хосту не должны превышать --rate-limit в секунду'
+    )
+
+
+def test_async_engine_retry_after(throttling_server, tmp_path):
+    pytest.importorskip('httpx')
+    from src.throttling import HostScheduler
+
+    server = throttling_server(throttled=1, retry_after=0.2)
+    session = sessions.AsyncSession(
+        cache_path=tmp_path / 'cache.sqlite', scheduler=HostScheduler()
+    )
+    try:
+        assert session.get(server.url).status_code == 200
+    finally:
+        session.close()
+    assert len(server.times) == 2
+    assert server.times[1] - server.times[0] >= 0.2
+
+
+def test_cache_ttls_order():
+    ttls = sessions.cache_ttls(Namespace(
+        cache_ttl=[('peps.python.org', 60), ('example.org', -1)]
+    ))
+    assert list(ttls)[:2] == ['peps.python.org', 'example.org'], (
+        'Шаблоны из --cache-ttl должны проверяться первыми'
+    )
+    assert ttls['peps.python.org'] == 60
+    assert 'docs.python.org' in ttls
+
+
+def test_cached_session_backend_and_ttl():
+    session = sessions.create_session(Namespace(cache_backend='memory'))
+    assert type(session.cache).__name__ == 'BaseCache'
+    assert session.settings.expire_after == -1
+    assert session.settings.urls_expire_after['peps.python.org'] == 3600
+
+
+def test_trim_cache_lru():
+    session = sessions.create_session(
+        Namespace(cache_backend='memory', cache_max_size=1)
+    )
+    adapter = requests_mock.Adapter()
+    for name in 'abc':
+        adapter.register_uri(
+            'GET', f'https://example.org/{name}', content=b'x' * 1000
+        )
+    session.mount('https://', adapter)
+    for name in 'abca':
+        session.get(f'https://example.org/{name}')
+        time.sleep(0.01)
+    assert sessions.trim_cache(session, 2500) == 1
+    assert not session.cache.contains(url='https://example.org/b'), (
+        'Вытесняться должен ответ, к которому дольше всего не обращались'
+    )
+    assert session.cache.contains(url='https://example.org/a')
+    assert session.cache.contains(url='https://example.org/c')
+    assert dict(sessions.cache_summary(session))['Ответов'] == 2
+
+
+def test_access_log_only_with_size_limit():
+    session = sessions.create_session(Namespace(cache_backend='memory'))
+    adapter = requests_mock.Adapter()
+    adapter.register_uri('GET', 'https://example.org/', text='x')
+    session.mount('https://', adapter)
+    session.get('https://example.org/')
+    assert session.access_log is None, (
+        'Без --cache-max-size журнал обращений к кешу не нужен'
+    )
+    assert sessions.trim_cache(session, 0) == 1
+
+
+def test_cache_compression_and_binary_limit(tmp_path):
+    import sqlite3
+
+    session = sessions.create_session(Namespace(
+        cache_compression='gzip', compression_threshold=100
+    ))
+    adapter = requests_mock.Adapter()
+    adapter.register_uri(
+        'GET', 'https://example.org/page',
+        content=b'<p>Lorem ipsum</p>' * 1000,
+        headers={'Content-Type': 'text/html'},
+    )
+    adapter.register_uri(
+        'GET', 'https://example.org/docs.zip',
+        content=b'PK' + b'\x00' * 2**21,
+        headers={
+            'Content-Type': 'application/zip',
+            'Content-Length': str(2 + 2**21),
+        },
+    )
+    session.mount('https://', adapter)
+    session.get('https://example.org/page')
+    session.get('https://example.org/docs.zip')
+    assert session.get('https://example.org/page').from_cache
+    assert not session.cache.contains(url='https://example.org/docs.zip'), (
+        'Большие двоичные ответы не должны попадать в кеш'
+    )
+    blob, = sqlite3.connect(tmp_path / 'http_cache.sqlite').execute(
+        'SELECT value FROM responses'
+    ).fetchone()
+    assert blob[:1] == b'G'
+    assert len(blob) < 2000
+
+
+class BrokenBody(io.RawIOBase):
+    """Тело ответа, соединение которого обрывается после size байт."""
+
+    def __init__(self, size):
+        self.left = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self.left:
+            raise ConnectionResetError('соединение разорвано')
+        size = min(len(buffer), self.left)
+        buffer[:size] = b'\x00' * size
+        self.left -= size
+        return size
+
+
+def test_stream_download_through_created_session(tmp_path):
+    session = sessions.create_session()
+    adapter = requests_mock.Adapter()
+    adapter.register_uri(
+        'GET', 'https://example.org/docs.zip',
+        body=BrokenBody(2**20),
+        headers={
+            'Content-Type': 'application/zip',
+            'Content-Length': str(2**22),
+        },
+    )
+    session.mount('https://', adapter)
+    with pytest.raises(Exception):
+        utils.stream_download(
+            session, 'https://example.org/docs.zip', tmp_path / 'docs.zip'
+        )
+    part = tmp_path / 'docs.zip.part'
+    assert part.exists() and part.stat().st_size > 0, (
+        'Архив должен записываться по частям сразу, а не читаться '
+        'в память целиком при проверке для кеша ответов'
+    )
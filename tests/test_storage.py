@@ -0,0 +1,113 @@
+import sqlite3
+
+try:
+    from src import storage
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `storage.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `storage.py`'
+
+
+def test_page_state_store(tmp_path):
+    store = storage.PageStateStore(tmp_path / 'state.sqlite')
+    assert store.get('https://peps.python.org/') is None
+    store.save('https://peps.python.org/', '"abc"', None, [['pep-1', 'A']])
+    reopened = storage.PageStateStore(tmp_path / 'state.sqlite')
+    assert reopened.get('https://peps.python.org/') == (
+        '"abc"', None, [['pep-1', 'A']]
+    )
+
+
+def test_parsed_cache_key(tmp_path):
+    cache = storage.ParsedCache(tmp_path / 'parsed.sqlite', 2**20)
+    key = cache.make_key(b'<html>', 'extract:1')
+    assert key == cache.make_key(b'<html>', 'extract:1')
+    assert key != cache.make_key(b'<html> ', 'extract:1'), (
+        'Изменение тела страницы должно менять ключ кеша'
+    )
+    assert key != cache.make_key(b'<html>', 'extract:2'), (
+        'Изменение версии функции извлечения должно менять ключ кеша'
+    )
+    cache.save(key, 'https://a/', ['Final'])
+    assert cache.get(key) == ['Final']
+
+
+def test_cache_access_log_batches_writes(tmp_path):
+    path = tmp_path / 'access.sqlite'
+    log = storage.CacheAccessLog(path)
+    for key in 'abca':
+        log.touch(key)
+    with sqlite3.connect(path) as connection:
+        assert connection.execute(
+            'SELECT COUNT(*) FROM access'
+        ).fetchone() == (0,), (
+            'Обращения к кешу не должны записываться в базу по одному'
+        )
+    assert sorted(log.accessed()) == ['a', 'b', 'c']
+    log.touch('d')
+    log.keep({'a', 'd'})
+    assert sorted(log.accessed()) == ['a', 'd']
+
+
+def test_parsed_cache_eviction(tmp_path):
+    cache = storage.ParsedCache(tmp_path / 'parsed.sqlite', max_size=100)
+    for number in range(10):
+        cache.save(f'key-{number}', 'https://a/', 'x' * 20)
+    assert cache.get('key-0') is None, (
+        'При превышении размера кеша старые записи должны удаляться'
+    )
+    assert cache.get('key-9') == 'x' * 20
+    total, = cache._connection.execute(
+        'SELECT SUM(size) FROM parsed'
+    ).fetchone()
+    assert total <= 100
+
+
+def test_parsed_cache_batches_access_times(tmp_path):
+    path = tmp_path / 'parsed.sqlite'
+    cache = storage.ParsedCache(path, max_size=40)
+    for number in range(3):
+        cache.save(f'key-{number}', 'https://a/', 'x' * 10)
+
+    def accessed(key):
+        with sqlite3.connect(path) as connection:
+            return connection.execute(
+                'SELECT accessed FROM parsed WHERE key = ?', (key,)
+            ).fetchone()[0]
+
+    saved = accessed('key-0')
+    assert cache.get('key-0') == 'x' * 10
+    assert accessed('key-0') == saved, (
+        'Чтение из кеша не должно записывать время обращения сразу'
+    )
+    cache.flush()
+    assert accessed('key-0') > saved
+    cache.get('key-1')
+    cache.save('key-3', 'https://a/', 'x' * 10)
+    assert cache.get('key-2') is None, (
+        'При вытеснении должно учитываться время ещё не записанных '
+        'обращений'
+    )
+    assert cache.get('key-1') is not None
+    cache.get('key-3')
+    del cache
+    assert accessed('key-3') > accessed('key-1'), (
+        'Накопленное время обращений должно записываться при удалении кеша'
+    )
+
+
+def test_checkpoint_resume(tmp_path):
+    path = tmp_path / 'checkpoint.jsonl'
+    with storage.Checkpoint(path) as checkpoint:
+        checkpoint.add('1', 'https://a/pep-0001/', 'Final')
+        checkpoint.add('2', 'https://a/pep-0002/', 'Draft')
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write('{"number": "3", "li')
+    resumed = storage.Checkpoint(path, resume=True)
+    assert list(resumed.done) == [
+        'https://a/pep-0001/', 'https://a/pep-0002/'
+    ], 'Недописанная строка журнала должна пропускаться'
+    resumed.finish()
+    assert not path.exists()
+    with storage.Checkpoint(path) as checkpoint:
+        assert not checkpoint.done, 'Без resume журнал начинается заново'
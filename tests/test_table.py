@@ -0,0 +1,56 @@
+from datetime import date
+
+try:
+    from src import table
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `table.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `table.py`'
+
+
+def make_table():
+    return table.ColumnTable((
+        ('Номер', table.IntColumn('H')),
+        ('Название', table.TextColumn()),
+        ('Статус', table.CategoryColumn()),
+        ('Создан', table.DateColumn()),
+    ))
+
+
+def test_column_table_round_trip():
+    rows = [
+        (8, 'Style Guide for Python Code', 'Active', '05-Jul-2001'),
+        (20, 'The Zen of Python', 'Active', '19-Aug-2004'),
+        (703, 'Making the GIL Optional — «ёж»', 'Accepted', ''),
+    ]
+    pep_table = make_table()
+    for row in rows:
+        pep_table.append(row)
+    assert len(pep_table) == 3
+    assert pep_table.header == ('Номер', 'Название', 'Статус', 'Создан')
+    assert list(pep_table.rows()) == [
+        (8, 'Style Guide for Python Code', 'Active', date(2001, 7, 5)),
+        (20, 'The Zen of Python', 'Active', date(2004, 8, 19)),
+        (703, 'Making the GIL Optional — «ёж»', 'Accepted', None),
+    ], 'Таблица должна возвращать те же значения, что в неё добавлены'
+    assert pep_table.count_by('Статус') == {'Active': 2, 'Accepted': 1}
+    assert pep_table.count_by('Номер') == {8: 1, 20: 1, 703: 1}
+
+
+def test_parse_date():
+    assert table.parse_date('13-Jun-2000') == date(2000, 6, 13)
+    assert table.parse_date('2000-06-13') == date(2000, 6, 13)
+    assert table.parse_date('июнь 2000') is None
+    assert table.parse_date(None) is None
+
+
+def test_column_table_is_compact():
+    pep_table = make_table()
+    for number in range(1000):
+        pep_table.append(
+            (number, f'PEP title {number}', 'Final', '13-Jun-2000')
+        )
+    assert pep_table.nbytes() < 1000 * 40, (
+        'Столбцы таблицы должны храниться компактно, '
+        'без отдельного объекта на каждое значение'
+    )
@@ -0,0 +1,90 @@
+import threading
+import time
+
+try:
+    from src import throttling
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `throttling.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `throttling.py`'
+
+
+def test_token_bucket_burst():
+    bucket = throttling.TokenBucket(rate=1000)
+    start = time.perf_counter()
+    bucket.consume(1000)
+    assert time.perf_counter() - start < 0.05, (
+        'Запас корзины должен расходоваться без ожидания'
+    )
+
+
+def test_token_bucket_shared_rate():
+    bucket = throttling.TokenBucket(rate=100_000)
+    threads = [
+        threading.Thread(
+            target=lambda: [bucket.consume(10_000) for _ in range(5)]
+        )
+        for _ in range(3)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.perf_counter() - start >= 0.45, (
+        'Общая скорость всех потоков не должна превышать ограничение'
+    )
+
+
+def test_retry_after_delay():
+    assert throttling.retry_after_delay('3') == 3
+    assert throttling.retry_after_delay(None) is None
+    assert throttling.retry_after_delay('soon') is None
+    date = 'Wed, 21 Oct 2015 07:28:00 GMT'
+    assert throttling.retry_after_delay(date) == 0, (
+        'Дата в прошлом не должна давать отрицательную задержку'
+    )
+
+
+def test_host_scheduler_concurrency():
+    scheduler = throttling.HostScheduler(concurrency=2)
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def request(url):
+        with scheduler.slot(url):
+            with lock:
+                active.append(url)
+                peak.append(active.count(url))
+            time.sleep(0.02)
+            with lock:
+                active.remove(url)
+
+    threads = [
+        threading.Thread(target=request, args=(f'https://{host}/',))
+        for host in ('a', 'b') * 4
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(peak) == 2, (
+        'К одному хосту не должно идти больше concurrency запросов'
+    )
+
+
+def test_host_scheduler_adaptive_backoff():
+    scheduler = throttling.HostScheduler(concurrency=8, backoff=0.1)
+    assert scheduler.feedback('https://a/1', 429)
+    assert scheduler.feedback('https://a/2', 503)
+    host = scheduler._host('https://a/')
+    assert host.limit == 2
+    assert 0.1 < scheduler.reserve('https://a/') <= 0.2, (
+        'Задержка после повторных 429 должна расти экспоненциально'
+    )
+    assert scheduler.reserve('https://b/') == 0, (
+        'Пауза одного хоста не должна задерживать другие'
+    )
+    assert not scheduler.feedback('https://a/3', 200)
+    assert host.limit == 3
@@ -1,11 +1,17 @@
+import hashlib
+import threading
+from argparse import Namespace
+
 import bs4
 import pytest
 import requests
 import requests_mock
 from conftest import MAIN_DOC_URL
 
+from tests.fixture_data import pages
+
 try:
-    from src import utils
+    from src import main, utils
 except ModuleNotFoundError:
     assert False, 'Убедитесь что в директории `src` есть файл `utils.py`'
 except ImportError:
@@ -55,3 +61,112 @@ def test_get_response(mock_session):
             'делает запрос к странице и возвращает ответ. \n'
             'Кстати: You are breathtaken!'
         )
+
+
+EXTRACTOR_PAGES = {
+    'extract_pep_index': pages.pep_index(30),
+    'extract_pep_status': pages.pep_page(8, section_count=5),
+    'extract_whats_new_links': pages.whats_new_index(['3.12', '3.11']),
+    'extract_whats_new_article': pages.whats_new_page('3.12', 5),
+    'extract_versions': pages.MAIN_DOC_PAGE,
+    'extract_archive_links': pages.download_page(),
+}
+
+
+@pytest.mark.parametrize('extract', EXTRACTOR_PAGES)
+def test_make_soup_partial_parse(extract):
+    page = EXTRACTOR_PAGES[extract]
+    extract = getattr(main, extract)
+    full_soup = bs4.BeautifulSoup(page, 'html.parser')
+    partial_soup = utils.make_soup(page, extract)
+    assert len(str(partial_soup)) < len(str(full_soup)), (
+        'Функция `make_soup` должна разбирать только нужную часть страницы'
+    )
+    assert extract(partial_soup) == extract(full_soup), (
+        'Частичный разбор страницы не должен менять извлечённые данные'
+    )
+
+
+def test_resolve_parser_fallback(caplog):
+    assert utils.resolve_parser('html.parser') == 'html.parser'
+    assert utils.resolve_parser('no-such-parser') == 'html.parser', (
+        'Если парсер не установлен, должен использоваться `html.parser`'
+    )
+    assert 'no-such-parser' in caplog.text
+
+
+ARCHIVE_URL = 'https://docs.python.org/3/archives/docs.zip'
+ARCHIVE = bytes(range(256)) * 64
+
+
+def archive_callback(request, context):
+    """Отдаёт архив целиком или запрошенный диапазон."""
+    requested = request.headers.get('Range')
+    if requested is None:
+        return ARCHIVE
+    start = int(requested[len('bytes='):-1])
+    context.status_code = 206
+    context.headers['Content-Range'] = (
+        f'bytes {start}-{len(ARCHIVE) - 1}/{len(ARCHIVE)}'
+    )
+    return ARCHIVE[start:]
+
+
+@pytest.fixture
+def archive_session(mock_session):
+    mock_session.mount('https://', mock_session.mock_adapter)
+    mock_session.mock_adapter.register_uri(
+        'GET', ARCHIVE_URL, content=archive_callback
+    )
+    return mock_session
+
+
+def test_stream_download(archive_session, tmp_path):
+    path = tmp_path / 'docs.zip'
+    digest = utils.stream_download(
+        archive_session, ARCHIVE_URL, path, chunk_size=1000
+    )
+    assert path.read_bytes() == ARCHIVE
+    assert digest == hashlib.sha256(ARCHIVE).hexdigest()
+    assert not (tmp_path / 'docs.zip.part').exists()
+    assert not archive_session.cache.contains(url=ARCHIVE_URL), (
+        'Архивы не должны попадать в кеш ответов'
+    )
+
+
+def test_stream_download_resume(archive_session, tmp_path):
+    (tmp_path / 'docs.zip.part').write_bytes(ARCHIVE[:5000])
+    path = tmp_path / 'docs.zip'
+    digest = utils.stream_download(archive_session, ARCHIVE_URL, path)
+    request = archive_session.mock_adapter.last_request
+    assert request.headers['Range'] == 'bytes=5000-', (
+        'Недокачанный файл должен догружаться с места остановки'
+    )
+    assert path.read_bytes() == ARCHIVE
+    assert digest == hashlib.sha256(ARCHIVE).hexdigest()
+
+
+def test_stream_download_checksum(archive_session, tmp_path):
+    path = tmp_path / 'docs.zip'
+    with pytest.raises(utils.DownloadException):
+        utils.stream_download(
+            archive_session, ARCHIVE_URL, path, expected_sha256='0' * 64
+        )
+    assert not path.exists()
+
+
+def test_map_pages_parse_processes_concurrency():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def parse_page(session, link):
+        barrier.wait()
+        return link
+
+    links = ['a', 'b', 'c']
+    got = list(utils.map_pages(
+        None, parse_page, links, Namespace(workers=1, parse_processes=3)
+    ))
+    assert got == list(zip(links, links)), (
+        'Страниц одновременно должно обрабатываться не меньше, '
+        'чем процессов --parse-processes'
+    )